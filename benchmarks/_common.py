@@ -0,0 +1,73 @@
+import importlib.util
+import os
+import ssl
+import subprocess
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+from typing import Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_action_command(action_dir: str) -> list:
+    """
+    Runs an action the way its image does, reading inputs from the environment.
+    """
+    return [sys.executable, os.path.join(REPO_ROOT, action_dir, "main.py")]
+
+
+def load_action_module(action_dir: str, module: str = "main"):
+    """
+    Loads a module from an action directory under a unique name,
+    since every action ships its own `main.py`.
+    """
+    path = os.path.join(REPO_ROOT, action_dir)
+    module_name = f"{action_dir.replace('-', '_').replace('/', '_')}_{module}"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    # sibling modules of the action (if any) are imported by their plain names
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    spec = importlib.util.spec_from_file_location(
+        module_name, os.path.join(path, f"{module}.py"))
+    loaded_module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = loaded_module
+    spec.loader.exec_module(loaded_module)
+    return loaded_module
+
+
+def start_server(handler_class, ssl_context: Optional[ssl.SSLContext] = None) -> ThreadingHTTPServer:
+    """
+    Starts a local HTTP server on a random port in a background thread.
+    The server speaks HTTPS when `ssl_context` is given.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+    server.daemon_threads = True
+    if ssl_context is not None:
+        server.socket = ssl_context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def get_server_url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    scheme = "https" if isinstance(server.socket, ssl.SSLSocket) else "http"
+    return f"{scheme}://{host}:{port}"
+
+
+def create_self_signed_certificate(directory: str) -> ssl.SSLContext:
+    """
+    Creates a self-signed certificate for 127.0.0.1 with `openssl` in `directory`,
+    and returns a server context using it. Clients have to trust `<directory>/cert.pem`.
+    """
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-keyout", key_path, "-out", cert_path,
+         "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1"],
+        check=True, capture_output=True)
+    ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    ssl_context.load_cert_chain(cert_path, key_path)
+    return ssl_context
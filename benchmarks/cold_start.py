@@ -0,0 +1,147 @@
+"""
+Times the cold start of every Docker action, from process start to its first output or first request,
+compiling its sources on every start versus the bytecode its image compiles at build time.
+With Docker, also times a job step building the action image from its Dockerfile (as on branches) and starting it,
+versus only starting the prebuilt image (as on release tags). Pulling images isn't timed.
+
+Usage: python benchmarks/cold_start.py [--runs 10] [--no-docker]
+"""
+import argparse
+import compileall
+import glob
+import os
+import selectors
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from _common import REPO_ROOT
+
+# inputs of each action, outputs are written to a temporary file
+ACTION_INPUTS = {
+    "fetch-container-tags": {
+        "INPUT_PACKAGE_NAME": "dbt-postgres", "INPUT_ORGANIZATION": "dbt-labs", "INPUT_PAT": "token",
+        "INPUT_REGEX": r"^1\.[0-9]+\.latest$", "INPUT_RETRIES": "0",
+    },
+    "fetch-repo-branches": {
+        "INPUT_REPO_NAME": "dbt-core", "INPUT_ORGANIZATION": "dbt-labs", "INPUT_PAT": "token",
+        "INPUT_REGEX": r"^1\.[0-9]+\.latest$", "INPUT_FETCH_PROTECTED_BRANCHES_ONLY": "false", "INPUT_RETRIES": "0",
+    },
+    "parse-semver": {"INPUT_VERSION": "1.2.3rc4"},
+    "py-package-info": {"INPUT_PACKAGE": "dbt-snowflake", "INPUT_CHECK-TEST-INDEX": "false", "INPUT_RETRIES": "0"},
+}
+
+
+def copy_sources(action_dir: str, target_dir: str) -> None:
+    os.makedirs(target_dir)
+    for path in glob.glob(os.path.join(REPO_ROOT, action_dir, "*.py")):
+        shutil.copy(path, target_dir)
+
+
+def build_layouts(directory: str) -> dict:
+    """
+    Lays out every action as sources only (compiled again by every container)
+    and as its image does (bytecode compiled at build time).
+    """
+    commands = {}
+    precompiled_dir = os.path.join(directory, "precompiled")
+    for action in ACTION_INPUTS:
+        copy_sources(action, os.path.join(directory, "sources", action))
+        copy_sources(action, os.path.join(precompiled_dir, action))
+        commands[action] = {
+            # -B: nothing is cached between runs, like in a fresh container
+            "sources": [sys.executable, "-B", os.path.join(directory, "sources", action, "main.py")],
+            "precompiled": [sys.executable, "-B", os.path.join(precompiled_dir, action, "main.py")],
+        }
+    compileall.compile_dir(precompiled_dir, quiet=1,
+                           invalidation_mode=compileall.py_compile.PycInvalidationMode.UNCHECKED_HASH)
+    return commands
+
+
+def build_image(action: str, tag: str) -> float:
+    """
+    Builds the image of an action without cache, like the setup of every job using it from a branch,
+    and returns the time it took. Base images are only pulled when missing, a fresh runner pulls them too.
+    """
+    started_at = time.perf_counter()
+    subprocess.run(["docker", "build", "--no-cache", "--quiet", "--tag", tag, os.path.join(REPO_ROOT, action)],
+                   check=True, capture_output=True)
+    return time.perf_counter() - started_at
+
+
+def get_container_command(tag: str, env: dict) -> list:
+    """
+    Runs the image with the inputs of the action, on the host network to reach the proxy.
+    --init forwards the termination to the action, which doesn't handle signals as PID 1.
+    """
+    command = ["docker", "run", "--rm", "--init", "--network", "host", "--env", "GITHUB_OUTPUT=/dev/null"]
+    for name in env:
+        if name.startswith("INPUT_") or name in ("PYTHONUNBUFFERED", "HTTP_PROXY", "HTTPS_PROXY", "NO_PROXY"):
+            command += ["--env", name]
+    return command + [tag]
+
+
+def measure_start(command: list, env: dict, proxy: socket.socket) -> float:
+    """
+    Time until the process writes anything or connects to the (proxy) network, whichever comes first.
+    """
+    started_at = time.perf_counter()
+    process = subprocess.Popen(command, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    with selectors.DefaultSelector() as selector:
+        selector.register(process.stdout, selectors.EVENT_READ)
+        selector.register(proxy, selectors.EVENT_READ)
+        events = selector.select(timeout=30)
+    elapsed = time.perf_counter() - started_at
+    assert events, f"{command} didn't start in time"
+    for key, _ in events:
+        if key.fileobj is proxy:
+            proxy.accept()[0].close()
+    process.terminate()
+    process.communicate()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--no-docker", action="store_true", help="only time the actions run by the local Python")
+    args = parser.parse_args()
+    use_docker = not args.no_docker and shutil.which("docker") is not None
+
+    # requests of networked actions go to a local proxy which only records the connection
+    proxy = socket.create_server(("127.0.0.1", 0))
+    proxy_url = f"http://127.0.0.1:{proxy.getsockname()[1]}"
+
+    with tempfile.TemporaryDirectory() as directory:
+        commands = build_layouts(directory)
+        print(f"median time to first output or request over {args.runs} runs")
+        for action, action_inputs in ACTION_INPUTS.items():
+            env = dict(os.environ, PYTHONUNBUFFERED="1", HTTP_PROXY=proxy_url, HTTPS_PROXY=proxy_url, NO_PROXY="",
+                       GITHUB_OUTPUT=os.path.join(directory, "output"), **action_inputs)
+            timings = {
+                name: statistics.median(measure_start(command, env, proxy) for _ in range(args.runs))
+                for name, command in commands[action].items()
+            }
+            baseline = timings["sources"]
+            print(f"{action:22} " + "  ".join(
+                f"{name}: {elapsed * 1000:6.1f} ms ({baseline / elapsed:.2f}x)" for name, elapsed in timings.items()))
+            if use_docker:
+                tag = f"actions-cold-start/{action}"
+                build_elapsed = build_image(action, tag)
+                container_command = get_container_command(tag, env)
+                start_elapsed = statistics.median(
+                    measure_start(container_command, env, proxy) for _ in range(args.runs))
+                built_elapsed = build_elapsed + start_elapsed
+                print(f"{'':22} Dockerfile (build + start): {built_elapsed * 1000:8.1f} ms (1.00x)  "
+                      f"prebuilt (start): {start_elapsed * 1000:6.1f} ms ({built_elapsed / start_elapsed:.2f}x)")
+    if not use_docker:
+        print("image builds and container starts weren't timed, Docker isn't available")
+    proxy.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Checks how `core-triage` handles partial failures, against the local API stand-in (fake_server.py):
+- rejected items: some aliases of the batched `addProjectV2ItemById` mutations fail, only those items are
+  reported as failed, every other item is added and the watermark isn't saved
+- failing repo / forbidden repo: a repo can't be resolved (GraphQL errors) or its queries are answered with a 403,
+  the run fails without saving the watermark and the other repos are still swept
+
+Needs graphql-core (pip install graphql-core). Exits with 1 when a check fails.
+
+Usage: python benchmarks/core_triage_failures.py [--reject-items-every 7] [--failing-repo repo-1]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+from _common import REPO_ROOT
+from fake_server import FakeServerConfig, start_fake_server
+
+CORE_TRIAGE = os.path.join(REPO_ROOT, "scripts", "core-triage", "project.py")
+FAILED_ITEM_PATTERN = re.compile(r"^Could not add item (\S+): ", re.MULTILINE)
+FAILED_REPO_PATTERN = re.compile(r"^Could not sweep repository (\S+): ", re.MULTILINE)
+
+
+def run_core_triage(url: str, directory: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, GH_TOKEN="token", GITHUB_API_URL=url, GITHUB_GRAPHQL_URL=f"{url}/graphql")
+    env.pop("GITHUB_STEP_SUMMARY", None)
+    return subprocess.run(
+        [sys.executable, CORE_TRIAGE, "--full-resync", "--team-cache-ttl-minutes", "0",
+         "--state-file", os.path.join(directory, "state.json"), "--mutations-per-minute", "60000"],
+        env=env, cwd=directory, capture_output=True, text=True)
+
+
+def check_rejected_items(reject_items_every: int) -> list:
+    """
+    Returns the failed checks.
+    """
+    server, apis = start_fake_server(FakeServerConfig(team_repos=3, reject_items_every=reject_items_every))
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            result = run_core_triage(f"http://127.0.0.1:{server.server_address[1]}", directory)
+            state_saved = os.path.exists(os.path.join(directory, "state.json"))
+    finally:
+        server.shutdown()
+
+    failed_items = set(FAILED_ITEM_PATTERN.findall(result.stdout))
+    problems = []
+    if not apis.rejected_items:
+        problems.append("no item was rejected, the check doesn't cover anything")
+    if failed_items != apis.rejected_items:
+        problems.append(f"reported {len(failed_items)} failed items, {len(apis.rejected_items)} were rejected: "
+                        f"{sorted(failed_items ^ apis.rejected_items)[:5]}...")
+    if not apis.project_items:
+        problems.append("no item was added, the rejected items failed the whole batch")
+    if state_saved:
+        problems.append("the watermark was saved although items failed")
+    if problems:
+        print(result.stdout[-2000:], result.stderr[-2000:], sep="\n")
+    print(f"rejected items: {len(apis.rejected_items)} rejected, {len(failed_items)} reported failed, "
+          f"{len(apis.project_items)} added, watermark {'saved' if state_saved else 'not saved'}")
+    return problems
+
+
+def check_failing_repo(name: str, config: FakeServerConfig, repo: str) -> list:
+    """
+    Returns the failed checks.
+    """
+    server, apis = start_fake_server(config)
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            result = run_core_triage(f"http://127.0.0.1:{server.server_address[1]}", directory)
+            state_saved = os.path.exists(os.path.join(directory, "state.json"))
+    finally:
+        server.shutdown()
+
+    failed_repos = set(FAILED_REPO_PATTERN.findall(result.stdout))
+    added_repos = {item_id.split("_")[1] for item_id in apis.project_items}
+    problems = []
+    if result.returncode == 0:
+        problems.append(f"{name}: the run succeeded although {repo} couldn't be swept")
+    if failed_repos != {repo}:
+        problems.append(f"{name}: reported failed repos {sorted(failed_repos)}, expected {repo}")
+    if repo in added_repos or not added_repos:
+        problems.append(f"{name}: items were added from {sorted(added_repos)}, expected the other repos only")
+    if state_saved:
+        problems.append(f"{name}: the watermark was saved although {repo} couldn't be swept")
+    if problems:
+        print(result.stdout[-2000:], result.stderr[-2000:], sep="\n")
+    print(f"{name}: exit code {result.returncode}, failed repos {sorted(failed_repos)}, "
+          f"{len(apis.project_items)} items added, watermark {'saved' if state_saved else 'not saved'}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reject-items-every", type=int, default=7)
+    parser.add_argument("--failing-repo", default="repo-1", help="one of the stand-in team repos (repo-0, repo-1...)")
+    args = parser.parse_args()
+
+    problems = check_rejected_items(args.reject_items_every)
+    problems += check_failing_repo(
+        "failing repo", FakeServerConfig(team_repos=3, failing_repos=args.failing_repo), args.failing_repo)
+    problems += check_failing_repo(
+        "forbidden repo", FakeServerConfig(team_repos=3, forbidden_repos=args.failing_repo), args.failing_repo)
+    for problem in problems:
+        print(f"FAILED {problem}")
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
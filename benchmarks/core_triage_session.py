@@ -0,0 +1,99 @@
+"""
+Times GitHub API calls of the `core-triage` script against a local HTTPS stand-in,
+opening a connection per call (the previous approach) versus the shared pooled session.
+
+Usage: python benchmarks/core_triage_session.py [--calls 200] [--workers 1] [--rtt-ms 0]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+
+import requests
+
+from _common import create_self_signed_certificate, get_server_url, load_action_module, start_server
+
+RESPONSE_BODY = json.dumps({"data": {"rateLimit": {"cost": 1, "remaining": 4999}}}).encode("utf-8")
+
+
+class GraphQLHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # answer right away, headers and body are written separately
+    disable_nagle_algorithm = True
+    rtt_seconds = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        # a new connection costs a TCP and a TLS round trip before the first request
+        time.sleep(2 * self.rtt_seconds)
+        super().setup()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        time.sleep(self.rtt_seconds)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(RESPONSE_BODY)))
+        self.end_headers()
+        self.wfile.write(RESPONSE_BODY)
+
+
+def process_request_without_session(url: str, headers: dict, json: dict = None) -> dict:
+    # the request `process_request` sent before connections were pooled
+    r = requests.post(url, headers=headers, json=json)
+    return r.json()
+
+
+def measure(process_request, url: str, calls: int, workers: int) -> float:
+    body = {"query": "query { rateLimit { cost remaining } }"}
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for response in executor.map(lambda _: process_request(url, {}, json=body), range(calls)):
+            assert response["data"]["rateLimit"]["remaining"] == 4999
+    return time.perf_counter() - started_at
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="simulated network round trip")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cert_dir:
+        ssl_context = create_self_signed_certificate(cert_dir)
+        # trusted by requests and httpx
+        os.environ["REQUESTS_CA_BUNDLE"] = os.environ["SSL_CERT_FILE"] = os.path.join(cert_dir, "cert.pem")
+        GraphQLHandler.rtt_seconds = args.rtt_ms / 1000
+        server = start_server(GraphQLHandler, ssl_context)
+        url = f"{get_server_url(server)}/graphql"
+
+        core_triage = load_action_module("scripts/core-triage", "project")
+        http_session = load_action_module("scripts/core-triage", "http_session")
+        clients = [
+            ("connection per call", process_request_without_session, None),
+            ("pooled session", core_triage.process_request, http_session.get_session({})),
+        ]
+        if http_session.httpx is not None:
+            # the stand-in only speaks HTTP/1.1, the client falls back to it
+            clients.append(
+                ("httpx client", core_triage.process_request, http_session.get_session({}, http2=True)))
+
+        print(f"{args.calls} calls, {args.workers} workers, simulated RTT {args.rtt_ms} ms")
+        baseline = None
+        for name, process_request, session in clients:
+            core_triage.session = session
+            elapsed = measure(process_request, url, args.calls, args.workers)
+            baseline = baseline or elapsed
+            print(f"{name:20} {elapsed * 1000:9.1f} ms ({elapsed / args.calls * 1000:.2f} ms/call, "
+                  f"{baseline / elapsed:.1f}x)")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
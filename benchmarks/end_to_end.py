@@ -0,0 +1,153 @@
+"""
+Runs every action and the `core-triage` script end to end against the local API stand-in (fake_server.py),
+reporting wall-clock time, requests, response bytes and peak memory of each run.
+Reports can be saved and compared with a previous one, regressions are flagged and fail the run.
+
+Usage: python benchmarks/end_to_end.py [--runs 3] [--case <name> ...] [--output report.json] [--baseline report.json]
+                                       [--latency-ms 0] [--error-rate 0] [--branches 500] ... (see fake_server.py)
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+
+from _common import REPO_ROOT, get_action_command
+from fake_server import add_config_arguments, get_config, start_fake_server
+
+CORE_TRIAGE = os.path.join(REPO_ROOT, "scripts", "core-triage", "project.py")
+
+# metrics compared with the baseline, higher is worse
+COMPARED_METRICS = ("wall_ms", "requests", "bytes_sent", "peak_rss_kb")
+
+
+@dataclass
+class Case:
+    name: str
+    command: list
+    inputs: dict
+    graphql: bool = False
+
+
+def get_cases(directory: str, mutations_per_minute: float) -> list:
+    fetch_inputs = {"INPUT_ORGANIZATION": "dbt-labs", "INPUT_PAT": "token", "INPUT_RETRIES": "3",
+                    "INPUT_REGEX": "", "INPUT_PERFORM_MATCH_METHOD": "match"}
+    return [
+        Case("py-package-info", get_action_command("py-package-info"), {
+            "INPUT_PACKAGE": "dbt-core", "INPUT_VERSION": "1.3.2", "INPUT_CHECK-TEST-INDEX": "false",
+            "INPUT_RETRIES": "3", "INPUT_EXTRA-CHECKSUM-TYPES": "md5"}),
+        Case("py-package-info-batch", get_action_command("py-package-info"), {
+            "INPUT_PACKAGES": "dbt-core\ndbt-postgres==1.3.2\ndbt-snowflake\ndbt-bigquery==1.2.0\ndbt-redshift",
+            "INPUT_CHECK-TEST-INDEX": "false", "INPUT_RETRIES": "3"}),
+        Case("fetch-container-tags", get_action_command("fetch-container-tags"), dict(
+            fetch_inputs, INPUT_PACKAGE_NAME="dbt-core")),
+        Case("fetch-container-tags-select", get_action_command("fetch-container-tags"), dict(
+            fetch_inputs, INPUT_PACKAGE_NAME="dbt-core", INPUT_REGEX=r"^1\.", INPUT_SELECT="latest-per-minor")),
+        Case("fetch-repo-branches", get_action_command("fetch-repo-branches"), dict(
+            fetch_inputs, INPUT_REPO_NAME="dbt-core", INPUT_FETCH_PROTECTED_BRANCHES_ONLY="false")),
+        Case("fetch-repo-branches-graphql", get_action_command("fetch-repo-branches"), dict(
+            fetch_inputs, INPUT_REPO_NAME="dbt-core", INPUT_FETCH_PROTECTED_BRANCHES_ONLY="false",
+            INPUT_API="graphql"), graphql=True),
+        Case("core-triage", [
+            sys.executable, CORE_TRIAGE, "--full-resync", "--team-cache-ttl-minutes", "0",
+            "--state-file", os.path.join(directory, "core-triage-state.json"),
+            "--mutations-per-minute", str(mutations_per_minute)], {"GH_TOKEN": "token"}, graphql=True),
+    ]
+
+
+def run_case(case: Case, env: dict, directory: str) -> dict:
+    """
+    Runs a case in its own process, peak memory is the maximum resident set size of that process (Linux: KB).
+    """
+    env = dict(env, GITHUB_OUTPUT=os.path.join(directory, "output"), **case.inputs)
+    open(env["GITHUB_OUTPUT"], "w").close()
+    started_at = time.perf_counter()
+    process = subprocess.Popen(case.command, env=env, cwd=directory,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    stderr = process.stderr.read()
+    _, status, rusage = os.wait4(process.pid, 0)
+    wall_seconds = time.perf_counter() - started_at
+    # the process is already reaped by wait4
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise RuntimeError(f"{case.name} failed with exit code {process.returncode}:\n{stderr.decode()[-2000:]}")
+    return {"wall_ms": wall_seconds * 1000, "peak_rss_kb": rusage.ru_maxrss}
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for name, metrics in report["cases"].items():
+        baseline_metrics = baseline.get("cases", {}).get(name)
+        if baseline_metrics is None:
+            continue
+        for metric in COMPARED_METRICS:
+            previous, current = baseline_metrics.get(metric), metrics[metric]
+            if previous and current > previous * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {previous:.0f} -> {current:.0f} (+{current / previous - 1:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="wall-clock time is the median of the runs")
+    parser.add_argument("--case", action="append", help="only run these cases")
+    parser.add_argument("--mutations-per-minute", type=float, default=6000,
+                        help="core-triage mutation pace, its default pace would make the run last minutes")
+    parser.add_argument("--output", help="save the report to this file")
+    parser.add_argument("--baseline", help="compare with a report saved before")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="relative increase flagged as a regression")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    config = get_config(args)
+    server, apis = start_fake_server(config)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    env = dict(os.environ, GITHUB_API_URL=url, GITHUB_GRAPHQL_URL=f"{url}/graphql", PYPI_URL=f"{url}/pypi",
+               TEST_PYPI_URL=f"{url}/pypi")
+
+    report = {"config": vars(config), "cases": {}}
+    with tempfile.TemporaryDirectory() as directory:
+        cases = [case for case in get_cases(directory, args.mutations_per_minute)
+                 if not args.case or case.name in args.case]
+        print(f"{'case':30} {'wall ms':>9} {'requests':>9} {'errors':>7} {'bytes':>11} {'peak RSS MB':>12}")
+        for case in cases:
+            if case.graphql and apis.schema is None:
+                print(f"{case.name:30} skipped, graphql-core is not installed")
+                continue
+            runs = []
+            for _ in range(args.runs):
+                apis.reset()
+                metrics = run_case(case, env, directory)
+                metrics.update(requests=apis.stats.requests, errors=apis.stats.errors,
+                               bytes_sent=apis.stats.bytes_sent)
+                runs.append(metrics)
+            metrics = {
+                "wall_ms": statistics.median(run["wall_ms"] for run in runs),
+                "requests": max(run["requests"] for run in runs),
+                "errors": max(run["errors"] for run in runs),
+                "bytes_sent": max(run["bytes_sent"] for run in runs),
+                "peak_rss_kb": max(run["peak_rss_kb"] for run in runs),
+            }
+            report["cases"][case.name] = metrics
+            print(f"{case.name:30} {metrics['wall_ms']:9.1f} {metrics['requests']:9} {metrics['errors']:7} "
+                  f"{metrics['bytes_sent']:11} {metrics['peak_rss_kb'] / 1024:12.1f}")
+    server.shutdown()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
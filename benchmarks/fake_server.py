@@ -0,0 +1,590 @@
+"""
+Local stand-in for the APIs the actions and scripts call, serving synthetic data:
+- PyPI JSON API (`/pypi/<name>/json`, `/pypi/<name>/<version>/json`) and artifact downloads (`/files/<filename>`)
+- GitHub REST API branches and container package versions, paginated with `Link` headers,
+  answered with rate limit headers and ETags
+- GitHub GraphQL API (`/graphql`) for `fetch-repo-branches` and `scripts/core-triage`,
+  only when graphql-core is installed (pip install graphql-core)
+
+Responses can be delayed and a share of them can fail with 502 or be rate limited.
+`addProjectV2ItemById` mutations can be rejected for every Nth issue or pr, failing that alias only.
+Some repos can fail to resolve (GraphQL errors, no data for them), or GraphQL requests mentioning them can be
+answered with a 403 secondary rate limit.
+Requests, errors and response bytes are counted, `/_stats` returns them and `/_reset` resets them.
+
+Point the actions at it with `GITHUB_API_URL`, `GITHUB_GRAPHQL_URL` and `PYPI_URL` (`<url>/pypi`).
+
+Usage: python benchmarks/fake_server.py [--port 0] [--latency-ms 0] [--error-rate 0] [--rate-limit 5000] ...
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, field, fields
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# graphql-core is optional, only needed for the GraphQL API (pip install graphql-core)
+try:
+    import graphql
+except ImportError:
+    graphql = None
+
+# artifacts are a repeated block of bytes, their digests are computed once per size
+ARTIFACT_BLOCK = bytes(range(256)) * 256
+GITHUB_PAGE_SIZE = 30
+
+# the parts of GitHub's GraphQL schema queried by `fetch-repo-branches` and `scripts/core-triage`
+GRAPHQL_SCHEMA = """
+scalar DateTime
+enum IssueState { OPEN CLOSED }
+enum PullRequestState { OPEN CLOSED MERGED }
+enum IssueOrderField { CREATED_AT UPDATED_AT COMMENTS }
+enum OrderDirection { ASC DESC }
+input IssueOrder { field: IssueOrderField! direction: OrderDirection! }
+input IssueFilters { labels: [String!] since: DateTime }
+type PageInfo { hasNextPage: Boolean! endCursor: String }
+type User { login: String! }
+type UserEdge { node: User }
+type UserConnection { edges: [UserEdge] nodes: [User] pageInfo: PageInfo }
+type Label { name: String! }
+type LabelEdge { node: Label }
+type LabelConnection { edges: [LabelEdge] }
+type Issue {
+  id: ID! title: String! number: Int! url: String! createdAt: DateTime updatedAt: DateTime closedAt: DateTime
+  author: User assignees(first: Int): UserConnection labels(first: Int): LabelConnection
+  participants(first: Int): UserConnection projectItems(first: Int): ProjectV2ItemConnection
+}
+type PullRequest {
+  id: ID! title: String! number: Int! url: String! createdAt: DateTime updatedAt: DateTime closedAt: DateTime
+  author: User assignees(first: Int): UserConnection labels(first: Int): LabelConnection
+  participants(first: Int): UserConnection projectItems(first: Int): ProjectV2ItemConnection
+}
+type IssueEdge { node: Issue }
+type IssueConnection { edges: [IssueEdge] pageInfo: PageInfo! }
+type PullRequestEdge { node: PullRequest }
+type PullRequestConnection { edges: [PullRequestEdge] pageInfo: PageInfo! }
+interface GitObject { oid: String! }
+type Commit implements GitObject { oid: String! committedDate: DateTime }
+type BranchProtectionRule { id: ID! }
+type Ref { name: String! target: GitObject branchProtectionRule: BranchProtectionRule }
+type RefConnection { nodes: [Ref] pageInfo: PageInfo! }
+type Repository {
+  name: String! isPrivate: Boolean!
+  issues(first: Int, after: String, states: [IssueState!], filterBy: IssueFilters, orderBy: IssueOrder): IssueConnection
+  pullRequests(first: Int, after: String, states: [PullRequestState!], orderBy: IssueOrder): PullRequestConnection
+  refs(refPrefix: String!, first: Int, after: String): RefConnection
+}
+type RepositoryConnection { nodes: [Repository] pageInfo: PageInfo! }
+type Team { repositories(first: Int, after: String): RepositoryConnection members(first: Int, after: String): UserConnection }
+union ProjectV2ItemContent = Issue | PullRequest
+type ProjectV2Item { id: ID! content: ProjectV2ItemContent project: ProjectV2 }
+type ProjectV2ItemConnection { nodes: [ProjectV2Item] pageInfo: PageInfo }
+type ProjectV2 { id: ID! number: Int! items(first: Int, after: String): ProjectV2ItemConnection }
+type Organization { projectV2(number: Int!): ProjectV2 team(slug: String!): Team }
+type RateLimit { cost: Int! remaining: Int! }
+type Query { repository(owner: String!, name: String!): Repository organization(login: String!): Organization rateLimit: RateLimit }
+input AddProjectV2ItemByIdInput { projectId: ID! contentId: ID! }
+type AddProjectV2ItemByIdPayload { item: ProjectV2Item }
+type Mutation { addProjectV2ItemById(input: AddProjectV2ItemByIdInput!): AddProjectV2ItemByIdPayload }
+"""
+
+# number of the one project of the stand-in, the project core-triage adds items to
+PROJECT_NUMBER = 22
+
+
+@dataclass
+class FakeServerConfig:
+    # delay of every response
+    latency_ms: float = 0.0
+    # share of responses failing with 502
+    error_rate: float = 0.0
+    # GitHub requests allowed per rate limit window, further requests fail with 403 until the window resets
+    rate_limit: int = 5000
+    rate_limit_window_seconds: float = 3600.0
+    seed: int = 0
+    # payload sizes
+    releases: int = 200
+    artifact_size_kb: int = 1024
+    branches: int = 500
+    container_versions: int = 1000
+    team_repos: int = 5
+    team_members: int = 50
+    issues_per_repo: int = 200
+    prs_per_repo: int = 30
+    # issues and prs whose number is a multiple of this can't be added to the project, 0 to add all of them
+    reject_items_every: int = 0
+    # comma separated repos which GraphQL queries can't resolve
+    failing_repos: str = ""
+    # comma separated repos, GraphQL requests mentioning them fail with a 403 secondary rate limit
+    forbidden_repos: str = ""
+
+
+@dataclass
+class FakeServerStats:
+    requests: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    not_modified: int = 0
+    bytes_sent: int = 0
+    requests_by_api: Dict[str, int] = field(default_factory=dict)
+
+
+class FakeApis:
+    """
+    Synthetic data and counters shared by the handler threads.
+    """
+
+    def __init__(self, config: FakeServerConfig):
+        self.config = config
+        self.stats = FakeServerStats()
+        self.project_items = set()
+        self.rejected_items = set()
+        self._lock = threading.Lock()
+        self._random = random.Random(config.seed)
+        self._rate_limit_reset = time.time() + config.rate_limit_window_seconds
+        self._rate_limit_used = 0
+        self._repo_items = {}
+        artifact = self.get_artifact(config.artifact_size_kb * 1024)
+        self.artifact_digests = {
+            "sha256": hashlib.sha256(artifact).hexdigest(),
+            "md5": hashlib.md5(artifact).hexdigest(),
+            "blake2b_256": hashlib.blake2b(artifact, digest_size=32).hexdigest(),
+        }
+        self.schema = build_graphql_schema(self) if graphql else None
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stats = FakeServerStats()
+            self.project_items = set()
+            self.rejected_items = set()
+            self._rate_limit_used = 0
+
+    def count_request(self, api: str) -> bool:
+        """
+        Counts a request, returns whether it should fail (error injection).
+        """
+        with self._lock:
+            self.stats.requests += 1
+            self.stats.requests_by_api[api] = self.stats.requests_by_api.get(api, 0) + 1
+            failed = self._random.random() < self.config.error_rate
+            self.stats.errors += failed
+            return failed
+
+    def use_rate_limit(self) -> Tuple[dict, bool]:
+        """
+        Takes a request from the GitHub rate limit.
+        Returns the rate limit headers of the response and whether the rate limit is exceeded.
+        """
+        with self._lock:
+            now = time.time()
+            if now >= self._rate_limit_reset:
+                self._rate_limit_reset = now + self.config.rate_limit_window_seconds
+                self._rate_limit_used = 0
+            exceeded = self._rate_limit_used >= self.config.rate_limit
+            if exceeded:
+                self.stats.rate_limited += 1
+            else:
+                self._rate_limit_used += 1
+            headers = {
+                "X-RateLimit-Limit": str(self.config.rate_limit),
+                "X-RateLimit-Remaining": str(self.config.rate_limit - self._rate_limit_used),
+                "X-RateLimit-Used": str(self._rate_limit_used),
+                "X-RateLimit-Reset": str(int(self._rate_limit_reset)),
+            }
+            return headers, exceeded
+
+    def count_bytes(self, size: int, not_modified: bool = False) -> None:
+        with self._lock:
+            self.stats.bytes_sent += size
+            self.stats.not_modified += not_modified
+
+    @staticmethod
+    def get_artifact(size: int) -> bytes:
+        return (ARTIFACT_BLOCK * (size // len(ARTIFACT_BLOCK) + 1))[:size]
+
+    def get_release_versions(self) -> List[str]:
+        versions = []
+        for i in range(self.config.releases):
+            minor, patch = divmod(i, 10)
+            versions.append(f"1.{minor}.{patch}" if patch < 8 else f"1.{minor + 1}.0rc{patch - 7}")
+        return versions
+
+    def get_release_artifacts(self, base_url: str, name: str, version: str) -> List[dict]:
+        artifacts = []
+        for filename, packagetype, python_version in (
+            (f"{name}-{version}.tar.gz", "sdist", "source"),
+            (f"{name.replace('-', '_')}-{version}-py3-none-any.whl", "bdist_wheel", "py3"),
+        ):
+            artifacts.append({
+                "filename": filename,
+                "packagetype": packagetype,
+                "python_version": python_version,
+                "url": f"{base_url}/files/{filename}",
+                "digests": self.artifact_digests,
+                "size": self.config.artifact_size_kb * 1024,
+            })
+        return artifacts
+
+    def get_package_document(self, base_url: str, name: str, version: Optional[str] = None) -> Optional[dict]:
+        versions = self.get_release_versions()
+        if version is not None and version not in versions:
+            return None
+        info = {
+            "name": name,
+            "version": version or versions[-1],
+            "home_page": f"https://example.com/{name}",
+            "summary": f"Synthetic {name} package",
+            "author": "dbt Labs",
+            "author_email": "info@example.com",
+        }
+        if version is not None:
+            return {"info": info, "urls": self.get_release_artifacts(base_url, name, version)}
+        return {
+            "info": info,
+            "releases": {release: self.get_release_artifacts(base_url, name, release) for release in versions},
+            "urls": self.get_release_artifacts(base_url, name, versions[-1]),
+        }
+
+    def get_branches(self) -> List[dict]:
+        branches = []
+        for i in range(self.config.branches):
+            name = f"1.{i // 3}.latest" if i % 3 == 0 else f"feature/change-{i}"
+            branches.append({
+                "name": name,
+                "commit": {"sha": hashlib.sha1(name.encode("utf-8")).hexdigest()},
+                "protected": name.endswith(".latest"),
+            })
+        return branches
+
+    def get_container_versions(self) -> List[dict]:
+        container_versions = []
+        for i in range(self.config.container_versions):
+            # newest first, like GitHub
+            number = self.config.container_versions - 1 - i
+            minor, patch = divmod(number, 20)
+            if patch % 5 == 4:
+                tags = []
+            elif patch % 5 == 3:
+                tags = [f"1.{minor}.{patch}rc1"]
+            else:
+                tags = [f"1.{minor}.{patch}"]
+            if i == 0:
+                tags.append("latest")
+            container_versions.append({
+                "id": number,
+                "name": f"sha256:{hashlib.sha256(str(number).encode('utf-8')).hexdigest()}",
+                "metadata": {"package_type": "container", "container": {"tags": tags}},
+            })
+        return container_versions
+
+    def get_repo_items(self, repo: str) -> List[dict]:
+        """
+        Issues and prs of a repo, generated once per repo name, any repo name exists.
+        """
+        with self._lock:
+            if repo not in self._repo_items:
+                repo_random = random.Random(f"{self.config.seed}-{repo}")
+                labels = ["triage", "bug", "enhancement", "Team:Adapters"]
+                items = []
+                for number in range(self.config.issues_per_repo + self.config.prs_per_repo):
+                    kind = "Issue" if number < self.config.issues_per_repo else "PullRequest"
+                    items.append({
+                        "__typename": kind,
+                        "id": f"{kind}_{repo}_{number}",
+                        "number": number + 1,
+                        "labels": repo_random.sample(labels, repo_random.randint(0, 2)),
+                        "updatedAt": f"2024-{1 + number % 12:02d}-{1 + number % 28:02d}T00:00:00Z",
+                        "repo": repo,
+                    })
+                self._repo_items[repo] = items
+            return self._repo_items[repo]
+
+
+def paginate(items: list, first: Optional[int], after: Optional[str]) -> dict:
+    """
+    A page of a GraphQL connection, cursors are item offsets.
+    """
+    start = int(after) if after else 0
+    end = start + (first or 100)
+    return {"items": items[start:end], "pageInfo": {"hasNextPage": end < len(items), "endCursor": str(end)}}
+
+
+def build_graphql_schema(apis: FakeApis):
+    schema = graphql.build_schema(GRAPHQL_SCHEMA)
+
+    def resolve_item(item: dict) -> dict:
+        return {
+            "__typename": item["__typename"],
+            "id": item["id"],
+            "title": f"{item['__typename']} {item['number']}",
+            "number": item["number"],
+            "url": f"https://github.com/dbt-labs/{item['repo']}/issues/{item['number']}",
+            "createdAt": item["updatedAt"],
+            "updatedAt": item["updatedAt"],
+            "closedAt": None,
+            "author": {"login": "author"},
+            "assignees": {"edges": []},
+            "labels": {"edges": [{"node": {"name": label}} for label in item["labels"]]},
+            "participants": {"edges": [{"node": {"login": "author"}}]},
+            # items are only ever added to the one project of the stand-in
+            "projectItems": {
+                "nodes": [{"id": f"PVTI_{item['id']}", "project": {"id": "PVT_1", "number": PROJECT_NUMBER}}]
+                if item["id"] in apis.project_items else []
+            },
+        }
+
+    def resolve_connection(items: list, first: Optional[int], after: Optional[str], order_by: Optional[dict]):
+        if order_by:
+            items = sorted(items, key=lambda item: item["updatedAt"], reverse=order_by["direction"] == "DESC")
+        page = paginate(items, first, after)
+        return {"edges": [{"node": resolve_item(item)} for item in page["items"]], "pageInfo": page["pageInfo"]}
+
+    def resolve_issues(repo, info, first=None, after=None, states=None, filterBy=None, orderBy=None):
+        items = [item for item in apis.get_repo_items(repo["name"]) if item["__typename"] == "Issue"]
+        filters = filterBy or {}
+        if filters.get("labels"):
+            items = [item for item in items if set(filters["labels"]) & set(item["labels"])]
+        if filters.get("since"):
+            items = [item for item in items if item["updatedAt"] >= filters["since"]]
+        return resolve_connection(items, first, after, orderBy)
+
+    def resolve_pull_requests(repo, info, first=None, after=None, states=None, orderBy=None):
+        items = [item for item in apis.get_repo_items(repo["name"]) if item["__typename"] == "PullRequest"]
+        return resolve_connection(items, first, after, orderBy)
+
+    def resolve_refs(repo, info, refPrefix, first=None, after=None):
+        page = paginate(apis.get_branches(), first, after)
+        nodes = [
+            {
+                "name": branch["name"],
+                "target": {"__typename": "Commit", "oid": branch["commit"]["sha"],
+                           "committedDate": "2024-01-04T16:35:03Z"},
+                "branchProtectionRule": {"id": f"BPR_{branch['name']}"} if branch["protected"] else None,
+            }
+            for branch in page["items"]
+        ]
+        return {"nodes": nodes, "pageInfo": page["pageInfo"]}
+
+    def resolve_team_repositories(team, info, first=None, after=None):
+        repos = [{"name": f"repo-{i}", "isPrivate": i % 5 == 4} for i in range(apis.config.team_repos)]
+        page = paginate(repos, first, after)
+        return {"nodes": page["items"], "pageInfo": page["pageInfo"]}
+
+    def resolve_team_members(team, info, first=None, after=None):
+        members = [{"login": f"member-{i}"} for i in range(apis.config.team_members)]
+        page = paginate(members, first, after)
+        return {"nodes": page["items"], "edges": [{"node": member} for member in page["items"]],
+                "pageInfo": page["pageInfo"]}
+
+    def resolve_project_items(project, info, first=None, after=None):
+        page = paginate(sorted(apis.project_items), first, after)
+        nodes = [{"id": f"PVTI_{item_id}", "content": {"__typename": item_id.split("_")[0], "id": item_id}}
+                 for item_id in page["items"]]
+        return {"nodes": nodes, "pageInfo": page["pageInfo"]}
+
+    def resolve_add_item(root, info, input):
+        every = apis.config.reject_items_every
+        # item ids end with their number, see `get_repo_items`
+        if every and (int(input["contentId"].rsplit("_", 1)[-1]) + 1) % every == 0:
+            apis.rejected_items.add(input["contentId"])
+            raise ValueError(f"Content {input['contentId']} can't be added to the project")
+        apis.project_items.add(input["contentId"])
+        return {"item": {"id": f"PVTI_{input['contentId']}"}}
+
+    def resolve_repository(root, info, owner, name):
+        if name in apis.config.failing_repos.split(","):
+            raise ValueError(f"Could not resolve to a Repository with the name '{owner}/{name}'.")
+        return {"name": name}
+
+    schema.query_type.fields["repository"].resolve = resolve_repository
+    schema.query_type.fields["organization"].resolve = lambda root, info, login: {"login": login}
+    schema.query_type.fields["rateLimit"].resolve = lambda root, info: {"cost": 1, "remaining": 4999}
+    schema.type_map["Repository"].fields["issues"].resolve = resolve_issues
+    schema.type_map["Repository"].fields["pullRequests"].resolve = resolve_pull_requests
+    schema.type_map["Repository"].fields["refs"].resolve = resolve_refs
+    schema.type_map["Organization"].fields["projectV2"].resolve = lambda org, info, number: {"id": "PVT_1", "number": number}
+    schema.type_map["Organization"].fields["team"].resolve = lambda org, info, slug: {"slug": slug}
+    schema.type_map["Team"].fields["repositories"].resolve = resolve_team_repositories
+    schema.type_map["Team"].fields["members"].resolve = resolve_team_members
+    schema.type_map["ProjectV2"].fields["items"].resolve = resolve_project_items
+    schema.mutation_type.fields["addProjectV2ItemById"].resolve = resolve_add_item
+    schema.type_map["ProjectV2ItemContent"].resolve_type = lambda value, *args: value["__typename"]
+    schema.type_map["GitObject"].resolve_type = lambda value, *args: value["__typename"]
+    return schema
+
+
+class FakeApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # answer right away, headers and body are written separately
+    disable_nagle_algorithm = True
+    apis: FakeApis = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def get_base_url(self) -> str:
+        return f"http://{self.headers.get('Host')}"
+
+    def send_body(self, body: bytes, status: int = 200, content_type: str = "application/json",
+                  headers: Optional[dict] = None) -> None:
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        not_modified = status == 200 and self.headers.get("If-None-Match") == etag
+        if not_modified:
+            status, body = 304, b""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.apis.count_bytes(len(body), not_modified=not_modified)
+
+    def send_json(self, value, status: int = 200, headers: Optional[dict] = None) -> None:
+        self.send_body(json.dumps(value).encode("utf-8"), status, headers=headers)
+
+    def send_page(self, path: str, items: list, headers: dict) -> None:
+        """
+        Sends a page of a GitHub REST API list, with `Link` headers to the next and last pages.
+        """
+        query = parse_qs(urlparse(self.path).query)
+        per_page = int(query.get("per_page", [GITHUB_PAGE_SIZE])[0])
+        page = int(query.get("page", [1])[0])
+        last_page = max(1, -(-len(items) // per_page))
+        links = []
+        if page < last_page:
+            links.append(f'<{self.get_base_url()}{path}?per_page={per_page}&page={page + 1}>; rel="next"')
+        if last_page > 1:
+            links.append(f'<{self.get_base_url()}{path}?per_page={per_page}&page={last_page}>; rel="last"')
+        if links:
+            headers = dict(headers, Link=", ".join(links))
+        self.send_json(items[(page - 1) * per_page:page * per_page], headers=headers)
+
+    def handle_request(self, api: str) -> Optional[dict]:
+        """
+        Delays, counts and possibly fails the request.
+        Returns the headers of the response, None when it was already answered.
+        """
+        time.sleep(self.apis.config.latency_ms / 1000)
+        if self.apis.count_request(api):
+            self.send_json({"message": "Server Error"}, status=502)
+            return None
+        if api == "pypi":
+            return {}
+        headers, exceeded = self.apis.use_rate_limit()
+        if exceeded:
+            self.send_json({"message": "API rate limit exceeded"}, status=403, headers=headers)
+            return None
+        return headers
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/_stats":
+            return self.send_body(json.dumps(asdict(self.apis.stats)).encode("utf-8"))
+        if path == "/_reset":
+            self.apis.reset()
+            return self.send_body(b"{}")
+
+        pypi_match = re.fullmatch(r"/pypi/([^/]+)(?:/([^/]+))?/json", path)
+        if pypi_match:
+            if self.handle_request("pypi") is None:
+                return
+            document = self.apis.get_package_document(self.get_base_url(), *pypi_match.groups())
+            return self.send_json(document or {"message": "Not Found"}, status=200 if document else 404)
+        if path.startswith("/files/"):
+            if self.handle_request("pypi") is None:
+                return
+            artifact = self.apis.get_artifact(self.apis.config.artifact_size_kb * 1024)
+            return self.send_body(artifact, content_type="application/octet-stream")
+
+        if re.fullmatch(r"/repos/[^/]+/[^/]+/branches", path):
+            headers = self.handle_request("rest")
+            if headers is None:
+                return
+            branches = self.apis.get_branches()
+            if parse_qs(urlparse(self.path).query).get("protected") == ["True"]:
+                branches = [branch for branch in branches if branch["protected"]]
+            return self.send_page(path, branches, headers)
+        if re.fullmatch(r"/orgs/[^/]+/packages/container/[^/]+/versions", path):
+            headers = self.handle_request("rest")
+            if headers is None:
+                return
+            return self.send_page(path, self.apis.get_container_versions(), headers)
+
+        self.send_json({"message": "Not Found"}, status=404)
+
+    def do_POST(self):
+        raw_body = self.rfile.read(int(self.headers["Content-Length"]))
+        body = json.loads(raw_body)
+        if urlparse(self.path).path != "/graphql":
+            return self.send_json({"message": "Not Found"}, status=404)
+        headers = self.handle_request("graphql")
+        if headers is None:
+            return
+        forbidden_repos = [repo for repo in self.apis.config.forbidden_repos.split(",") if repo]
+        if any(f'"{repo}"'.encode("utf-8") in raw_body for repo in forbidden_repos):
+            return self.send_json({"message": "You have exceeded a secondary rate limit."}, status=403,
+                                  headers=headers)
+        if self.apis.schema is None:
+            return self.send_json({"errors": [{"message": "graphql-core is not installed"}]}, status=501)
+        if "query" not in body:
+            # automatic persisted queries aren't supported, like GitHub
+            return self.send_json({"errors": [{"message": "PersistedQueryNotSupported"}]}, headers=headers)
+        result = graphql.graphql_sync(self.apis.schema, body["query"], variable_values=body.get("variables"))
+        response = {}
+        if result.data is not None:
+            response["data"] = result.data
+        if result.errors:
+            response["errors"] = [{"message": error.message, "path": error.path} for error in result.errors]
+        self.send_json(response, headers=headers)
+
+
+def start_fake_server(config: FakeServerConfig, port: int = 0):
+    """
+    Starts the stand-in on a local port in a background thread.
+    Returns the server along with its data and counters.
+    """
+    apis = FakeApis(config)
+    handler_class = type("BoundFakeApiHandler", (FakeApiHandler,), {"apis": apis})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler_class)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, apis
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    for config_field in fields(FakeServerConfig):
+        parser.add_argument(f"--{config_field.name.replace('_', '-')}", type=config_field.type,
+                            default=config_field.default)
+
+
+def get_config(args: argparse.Namespace) -> FakeServerConfig:
+    return FakeServerConfig(**{config_field.name: getattr(args, config_field.name)
+                               for config_field in fields(FakeServerConfig)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=0)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    server, apis = start_fake_server(get_config(args), args.port)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    if apis.schema is None:
+        print("graphql-core is not installed, the GraphQL API isn't served")
+    print(f"GITHUB_API_URL={url} GITHUB_GRAPHQL_URL={url}/graphql PYPI_URL={url}/pypi", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
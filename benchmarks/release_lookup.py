@@ -0,0 +1,70 @@
+"""
+Compares release lookups of `py-package-info` over a synthetic package document
+against the previous approach of parsing every release version on each lookup.
+
+Usage: python benchmarks/release_lookup.py [--releases 5000] [--lookups 50]
+"""
+import argparse
+import random
+import time
+
+from packaging.version import Version
+
+from _common import load_action_module
+
+
+def get_artifact_version_by_scan(metadata, version):
+    # the lookup `get_artifact_version` used before releases were indexed
+    artifact = None
+    for pypi_version in metadata['releases']:
+        if str(Version(pypi_version)) == version:
+            for version_artifact in metadata['releases'][pypi_version]:
+                if version_artifact['packagetype'] == 'sdist':
+                    artifact = version_artifact
+                    break
+    return artifact
+
+
+def build_metadata(releases_count: int) -> dict:
+    releases = {}
+    for i in range(releases_count):
+        version = f"{i // 100}.{i % 100 // 10}.{i % 10}"
+        releases[version] = [
+            {"packagetype": "bdist_wheel", "url": f"https://files.example/pkg-{version}-py3-none-any.whl"},
+            {"packagetype": "sdist", "url": f"https://files.example/pkg-{version}.tar.gz"},
+        ]
+    return {"releases": releases}
+
+
+def measure(lookup, metadata, versions) -> float:
+    started_at = time.perf_counter()
+    for version in versions:
+        assert lookup(metadata, version) is not None
+    return time.perf_counter() - started_at
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--releases", type=int, default=5000)
+    parser.add_argument("--lookups", type=int, default=50)
+    args = parser.parse_args()
+
+    py_package_info = load_action_module("py-package-info")
+    metadata = build_metadata(args.releases)
+    versions = random.Random(0).choices(list(metadata["releases"]), k=args.lookups)
+
+    scan_elapsed = measure(get_artifact_version_by_scan, metadata, versions)
+    started_at = time.perf_counter()
+    release_index = py_package_info.get_release_index(metadata)
+    index_elapsed = time.perf_counter() - started_at + measure(
+        lambda metadata, version: py_package_info.get_artifact_version(metadata, version, release_index),
+        metadata, versions)
+
+    print(f"{args.lookups} lookups over {args.releases} releases")
+    print(f"scan:  {scan_elapsed * 1000:9.2f} ms ({scan_elapsed / args.lookups * 1000:.3f} ms/lookup)")
+    print(f"index: {index_elapsed * 1000:9.2f} ms ({index_elapsed / args.lookups * 1000:.3f} ms/lookup, index build included)")
+    print(f"speedup: {scan_elapsed / index_elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
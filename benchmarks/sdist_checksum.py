@@ -0,0 +1,66 @@
+"""
+Computes checksums of a large artifact served by a local HTTP stand-in
+and checks that peak memory stays bounded while hashing.
+
+Usage: python benchmarks/sdist_checksum.py [--size-mb 300] [--max-rss-growth-mb 64]
+"""
+import argparse
+import resource
+import sys
+import time
+from http.server import BaseHTTPRequestHandler
+
+from _common import get_server_url, load_action_module, start_server
+
+BLOCK = bytes(range(256)) * 4096  # 1 MiB
+
+
+class LargeArtifactHandler(BaseHTTPRequestHandler):
+    size_mb = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(BLOCK) * self.size_mb))
+        self.end_headers()
+        for _ in range(self.size_mb):
+            self.wfile.write(BLOCK)
+
+
+def get_peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=300)
+    parser.add_argument("--max-rss-growth-mb", type=int, default=64)
+    args = parser.parse_args()
+
+    py_package_info = load_action_module("py-package-info")
+    LargeArtifactHandler.size_mb = args.size_mb
+    server = start_server(LargeArtifactHandler)
+    artifact = {"url": f"{get_server_url(server)}/artifact.tar.gz", "digests": {}}
+
+    rss_before = get_peak_rss_mb()
+    started_at = time.monotonic()
+    checksums = py_package_info.get_artifact_checksums(
+        artifact, {"name": "large-artifact"}, ["sha256", "md5", "blake2b_256"])
+    elapsed = time.monotonic() - started_at
+    rss_growth = get_peak_rss_mb() - rss_before
+    server.shutdown()
+
+    print(f"checksums: {checksums}")
+    print(f"size: {args.size_mb} MiB, elapsed: {elapsed:.2f}s, "
+          f"throughput: {args.size_mb / elapsed:.1f} MiB/s, peak RSS growth: {rss_growth:.1f} MiB")
+
+    if rss_growth > args.max_rss_growth_mb:
+        print(f"Peak RSS grew by more than {args.max_rss_growth_mb} MiB", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Compares parsing release candidates with `parse-semver` one version per run, like workflows calling the action
+for every candidate, against a single run with the `versions` input.
+Runs are processes started like the action image does, without the container start every step adds on top.
+
+Usage: python benchmarks/semver_batch.py [--versions 50]
+"""
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+
+from _common import get_action_command
+
+
+def build_versions(versions_count: int) -> list:
+    versions = []
+    for i in range(versions_count):
+        minor, patch = divmod(i, 5)
+        versions.append(f"1.{minor}.{patch}" if patch < 3 else f"1.{minor}.{patch}rc{patch - 2}")
+    return versions
+
+
+def run_parse_semver(inputs: dict, output_path: str) -> None:
+    env = dict(os.environ, GITHUB_OUTPUT=output_path, **inputs)
+    subprocess.run(get_action_command("parse-semver"), env=env, check=True, stdout=subprocess.DEVNULL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--versions", type=int, default=50)
+    args = parser.parse_args()
+
+    versions = build_versions(args.versions)
+    with tempfile.TemporaryDirectory() as directory:
+        output_path = os.path.join(directory, "output")
+
+        started_at = time.perf_counter()
+        for version in versions:
+            run_parse_semver({"INPUT_VERSION": version}, output_path)
+        per_version_elapsed = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        run_parse_semver({"INPUT_VERSIONS": "\n".join(versions)}, output_path)
+        batch_elapsed = time.perf_counter() - started_at
+
+    print(f"{args.versions} versions")
+    print(f"run per version: {per_version_elapsed * 1000:9.1f} ms")
+    print(f"single batch:    {batch_elapsed * 1000:9.1f} ms")
+    print(f"speedup: {per_version_elapsed / batch_elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
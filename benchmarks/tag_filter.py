@@ -0,0 +1,84 @@
+"""
+Compares filtering synthetic container tags with the `fetch-container-tags` pattern filter
+against the previous approach of compiling the regex again for every page of tags.
+
+Usage: python benchmarks/tag_filter.py [--tags 100000] [--page-size 100]
+"""
+import argparse
+import random
+import re
+import time
+
+from _common import load_action_module
+
+# (name, include patterns, exclude patterns, method)
+CASES = [
+    ("single regex", [r"^1\.[0-9]+\.latest$"], [], "match"),
+    ("literal prefix", [r"^1\.9\."], [], "match"),
+    ("literal prefixes", [r"1\.7\.", r"1\.8\.", r"1\.9\."], [], "match"),
+    ("several regexes", [r"^1\.[7-9]\.\d+$", r"latest$", r"^2\.\d+\.\d+rc\d+$"], [], "search"),
+    ("include and exclude", [r"^1\.\d+\.\d+$"], [r"^1\.[0-4]\.", r"b\d+$"], "match"),
+]
+
+
+def filter_by_page(pages, include, exclude, method):
+    # the filtering `apply_regex_to_tags` did before patterns were compiled once,
+    # (it took a single regex, several patterns are tried one by one)
+    tags = []
+    for page in pages:
+        if include:
+            methods = [getattr(re.compile(regex), method) for regex in include]
+            page = [tag for tag in page if any(match(tag) for match in methods)]
+        if exclude:
+            methods = [getattr(re.compile(regex), method) for regex in exclude]
+            page = [tag for tag in page if not any(match(tag) for match in methods)]
+        tags += page
+    return tags
+
+
+def filter_with_pattern_filter(pages, include, exclude, method, pattern_filter_module):
+    tags_filter = pattern_filter_module.PatternFilter(include, exclude, method)
+    tags = []
+    for page in pages:
+        tags += tags_filter.filter(page)
+    return tags
+
+
+def build_tags(tags_count: int) -> list:
+    rng = random.Random(0)
+    tags = []
+    for i in range(tags_count):
+        major, minor, patch = rng.choice((1, 1, 1, 2)), rng.randrange(12), rng.randrange(30)
+        suffix = rng.choice(("", "", "", f"b{rng.randrange(5)}", f"rc{rng.randrange(5)}", ".latest"))
+        tags.append(f"{major}.{minor}.{patch}{suffix}" if suffix != ".latest" else f"{major}.{minor}.latest")
+    return tags
+
+
+def measure(filter_tags, *args):
+    started_at = time.perf_counter()
+    tags = filter_tags(*args)
+    return time.perf_counter() - started_at, tags
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tags", type=int, default=100000)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    pattern_filter = load_action_module("fetch-container-tags", "pattern_filter")
+    tags = build_tags(args.tags)
+    pages = [tags[i:i + args.page_size] for i in range(0, len(tags), args.page_size)]
+
+    print(f"{args.tags} tags, {len(pages)} pages")
+    for name, include, exclude, method in CASES:
+        page_elapsed, page_tags = measure(filter_by_page, pages, include, exclude, method)
+        filter_elapsed, filter_tags = measure(
+            filter_with_pattern_filter, pages, include, exclude, method, pattern_filter)
+        assert page_tags == filter_tags
+        print(f"{name:20} per page: {page_elapsed * 1000:8.1f} ms  pattern filter: {filter_elapsed * 1000:8.1f} ms  "
+              f"({page_elapsed / filter_elapsed:.1f}x, {len(filter_tags)} tags kept)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Compares sorting synthetic container tags by version and selecting the latest tag of every minor line
+with `fetch-container-tags` against parsing versions in every comparison, like a `sort -V` style comparator.
+
+Usage: python benchmarks/tag_sort.py [--tags 20000]
+"""
+import argparse
+import functools
+import random
+import time
+
+from packaging.version import InvalidVersion, Version
+
+from _common import load_action_module
+
+
+def compare_tags(tag, other_tag):
+    # tags which aren't versions sort last
+    try:
+        version = Version(tag)
+    except InvalidVersion:
+        version = None
+    try:
+        other_version = Version(other_tag)
+    except InvalidVersion:
+        other_version = None
+    if version is None or other_version is None:
+        return (version is None) - (other_version is None)
+    return (version < other_version) - (version > other_version)
+
+
+def select_latest_per_minor_by_comparison(tags):
+    selected_tags = []
+    seen_lines = set()
+    for tag in sorted(tags, key=functools.cmp_to_key(compare_tags)):
+        try:
+            version = Version(tag)
+        except InvalidVersion:
+            continue
+        if not version.is_prerelease and (version.major, version.minor) not in seen_lines:
+            seen_lines.add((version.major, version.minor))
+            selected_tags.append(tag)
+    return selected_tags
+
+
+def build_tags(tags_count: int) -> list:
+    rng = random.Random(0)
+    tags = ["latest"]
+    for i in range(tags_count):
+        major, minor, patch = rng.choice((1, 1, 1, 2)), rng.randrange(20), rng.randrange(200)
+        kind = rng.choice(("release", "release", "pre-release", "line", "sha"))
+        if kind == "release":
+            tags.append(f"{major}.{minor}.{patch}")
+        elif kind == "pre-release":
+            tags.append(f"{major}.{minor}.{patch}{rng.choice(('b', 'rc'))}{rng.randrange(5)}")
+        elif kind == "line":
+            tags.append(f"{major}.{minor}.latest")
+        else:
+            tags.append(f"sha-{i:08x}")
+    return list(dict.fromkeys(tags))
+
+
+def measure(select, tags):
+    started_at = time.perf_counter()
+    selected_tags = select(tags)
+    return time.perf_counter() - started_at, selected_tags
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tags", type=int, default=20000)
+    args = parser.parse_args()
+
+    tag_versions = load_action_module("fetch-container-tags", "tag_versions")
+    tags = build_tags(args.tags)
+
+    comparison_elapsed, comparison_tags = measure(select_latest_per_minor_by_comparison, tags)
+    key_elapsed, key_tags = measure(
+        lambda tags: tag_versions.select_tags(tags, tag_versions.LATEST_PER_MINOR), tags)
+    assert [Version(tag) for tag in comparison_tags] == [Version(tag) for tag in key_tags]
+
+    print(f"{len(tags)} tags, {len(key_tags)} minor lines")
+    print(f"parse per comparison: {comparison_elapsed * 1000:9.1f} ms")
+    print(f"cached version keys:  {key_elapsed * 1000:9.1f} ms")
+    print(f"speedup: {comparison_elapsed / key_elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
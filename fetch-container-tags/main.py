@@ -1,9 +1,23 @@
 import requests
 import re
 import os
-import time
+import json
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from dataclasses import dataclass
+from typing import Iterator, Optional
+from urllib.parse import parse_qs, urlparse
+from pattern_filter import PatternFilter, parse_patterns
+from request_scheduler import RequestScheduler
+from request_trace import RequestTrace
+from response_cache import ResponseCache
+from tag_versions import select_tags, sort_tags
+
+# set by GitHub Actions runners (to the GitHub Enterprise Server API there), can point to a local stand-in
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com")
+# GitHub API doesn't return more than 100 items per page
+VERSIONS_PER_PAGE = 100
+MAX_PARALLEL_REQUESTS = 4
 
 
 class ProvidedMatchMethodNotSupportedOrIncorrect(Exception):
@@ -11,6 +25,16 @@ class ProvidedMatchMethodNotSupportedOrIncorrect(Exception):
     pass
 
 
+class ProvidedSortMethodNotSupportedOrIncorrect(Exception):
+    """The specified sort method is not supported or incorrect"""
+    pass
+
+
+class ProvidedTagsSelectorNotSupportedOrIncorrect(Exception):
+    """The specified tags selector is not supported or incorrect"""
+    pass
+
+
 @dataclass
 class FetchRequestData:
     package_type: str
@@ -24,9 +48,22 @@ class FetchRequestData:
         Description: Fetch tags for specific container
         GH API doc: https://docs.github.com/en/rest/packages?apiVersion=2022-11-28#list-package-versions-for-a-package-owned-by-an-organization
         """
-        url = f"https://api.github.com/orgs/{self.organization}/packages/{self.package_type}/{self.package_name}/versions"
+        url = f"{GITHUB_API_URL}/orgs/{self.organization}/packages/{self.package_type}/{self.package_name}/versions"
         return url
 
+    def get_request_url_template(self) -> str:
+        """
+        Description: Request URL without the organization and package, groups requests in the trace
+        """
+        url_template = "/orgs/{organization}/packages/{package_type}/{package_name}/versions"
+        return url_template
+
+    def get_request_parameters(self) -> dict:
+        parameters = {
+            "per_page": VERSIONS_PER_PAGE,
+        }
+        return parameters
+
     def get_request_headers(self) -> dict:
         headers = {
             "Accept": "application/vnd.github+json",
@@ -42,78 +79,101 @@ class SupportedMatchMethod(Enum):
     FINDALL = 'findall'
 
 
+class SupportedSortMethod(Enum):
+    API = 'api'
+    SEMVER = 'semver'
+
+
+class SupportedTagsSelector(Enum):
+    ALL = 'all'
+    LATEST = 'latest'
+    LATEST_PER_MINOR = 'latest-per-minor'
+    TOP_N = 'top-n'
+
+
 def set_output(name, value):
     with open(os.environ["GITHUB_OUTPUT"], "a") as f:
         f.write(f"{name}={value}\n")
 
 
-def get_exponential_backoff_in_seconds(attempt_number: int) -> int:
+def get_last_page_number(response: requests.Response) -> int:
     """
-    Returns exponential back-off - depending on number of attempt.
-    Considers that `attempt_number` starts from 0.
-    Initial back-off - 4 second.
+    Reads the number of the last page from the `Link` header.
+    Returns 1 if the response isn't paginated.
     """
-    return pow(attempt_number + 2, 2)
+    last_page_url = response.links.get("last", {}).get("url")
+    if last_page_url is None:
+        return 1
+    return int(parse_qs(urlparse(last_page_url).query)["page"][0])
 
 
-def fetch_package_metadata(request_data: FetchRequestData):
-    url: str = request_data.get_request_url()
-    headers: dict = request_data.get_request_headers()
+def fetch_package_versions_page(scheduler: RequestScheduler, request_data: FetchRequestData, page: int) -> requests.Response:
+    print(f"::debug::Fetching page {page} of package metadata")
+    parameters: dict = {**request_data.get_request_parameters(), "page": page}
+    return scheduler.request("GET", request_data.get_request_url(), params=parameters,
+                             url_template=request_data.get_request_url_template())
 
+
+def fetch_package_metadata(request_data: FetchRequestData, scheduler: RequestScheduler) -> Iterator[list]:
+    """
+    Yields package versions metadata page by page, in the order of pages.
+    The first page tells how many pages there are,
+    the rest of them are fetched concurrently through the shared scheduler.
+    Pages which aren't fetched yet are cancelled once the caller stops iterating.
+    """
     print(f"::debug::Start fetching package metadata")
 
-    for attempt in range(request_data.attempts_limit):
-        print(
-            f"::debug::Fetching package metadata - attempt {attempt + 1} / {request_data.attempts_limit}")
-        try:
-            response = requests.get(url=url, headers=headers)
-            response.raise_for_status()
-        except requests.exceptions.RequestException as e:
-            if attempt == request_data.attempts_limit - 1:
-                raise RuntimeError(f"{e}")
-
-            if attempt < request_data.attempts_limit - 1:
-                print(
-                    f"Exception occurred: {type(e).__name__} - {e}. Retrying.")
-                back_off = get_exponential_backoff_in_seconds(attempt)
-                print(
-                    f"::debug::Sleep for {back_off} seconds before next attempt")
-                time.sleep(back_off)
-                continue
-        break
+    first_page = fetch_package_versions_page(scheduler, request_data, 1)
+    last_page_number = get_last_page_number(first_page)
+    print(f"::debug::Fetching {last_page_number} pages of package metadata")
+    yield first_page.json()
 
-    print(f"::debug::Finish fetching metadata")
+    executor = ThreadPoolExecutor(max_workers=MAX_PARALLEL_REQUESTS)
+    try:
+        pages = [
+            executor.submit(fetch_package_versions_page, scheduler, request_data, page)
+            for page in range(2, last_page_number + 1)
+        ]
+        for page in pages:
+            yield page.result().json()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
 
-    return response.json()
+    print(f"::debug::Finish fetching metadata")
 
 
-def get_tags_list(package_metadata) -> list:
+def get_tags_list(package_metadata, seen_tags: Optional[set] = None) -> list:
+    """
+    Returns tags in the order of appearance, without duplicates.
+    Tags from `seen_tags` are skipped as well, and `seen_tags` is updated
+    so tags can be deduplicated across pages.
+    """
+    if seen_tags is None:
+        seen_tags = set()
     tags = []
     for key in package_metadata:
-        tags += key.get('metadata', {}).get('container', {}).get('tags')
+        for tag in key.get('metadata', {}).get('container', {}).get('tags', []):
+            if tag not in seen_tags:
+                seen_tags.add(tag)
+                tags.append(tag)
     return tags
 
 
-def apply_regex_to_tags(regex: str, tags: list, perform_method: SupportedMatchMethod):
-    regex = re.compile(regex)
-    method: function = regex.match
-    if (perform_method == SupportedMatchMethod.FINDALL):
-        method = regex.match
-    if (perform_method == SupportedMatchMethod.SEARCH):
-        method = regex.search
-    print(f"::debug::Applying regex {regex} via {perform_method}")
-    return list(filter(method, tags))
-
-
 def main():
     package_name = os.environ["INPUT_PACKAGE_NAME"]
     package_type = "container"
     organization = os.environ["INPUT_ORGANIZATION"]
     pat = os.environ["INPUT_PAT"]
     attempts_limit = int(os.environ["INPUT_RETRIES"]) + 1
+    cache_dir = os.environ.get("INPUT_CACHE_DIR", "")
+    trace_file = os.environ.get("INPUT_TRACE_FILE", "")
+    limit = int(os.environ.get("INPUT_LIMIT") or 0)
     regex = ""
+    exclude_regex = os.environ.get("INPUT_EXCLUDE_REGEX", "")
     perform_match_method_input = ""
     perform_match_method = -1
+    top_n = int(os.environ.get("INPUT_TOP_N") or 10)
+    include_pre_releases = os.environ.get("INPUT_INCLUDE_PRE_RELEASES", "false") == "true"
 
     if os.environ.get('INPUT_REGEX') is not None:
         regex = os.environ["INPUT_REGEX"]
@@ -129,6 +189,30 @@ def main():
     except Exception as e:
         raise RuntimeError(f"{e}")
 
+    try:
+        sort_method_input = (os.environ.get("INPUT_SORT") or "api").upper()
+        if hasattr(SupportedSortMethod, sort_method_input):
+            sort_method = SupportedSortMethod[sort_method_input]
+        else:
+            raise ProvidedSortMethodNotSupportedOrIncorrect(
+                f"Sort method {sort_method_input} is not supported or incorrect")
+        tags_selector_input = (os.environ.get("INPUT_SELECT") or "all").upper().replace("-", "_")
+        if hasattr(SupportedTagsSelector, tags_selector_input):
+            tags_selector = SupportedTagsSelector[tags_selector_input]
+        else:
+            raise ProvidedTagsSelectorNotSupportedOrIncorrect(
+                f"Tags selector {tags_selector_input} is not supported or incorrect")
+    except Exception as e:
+        raise RuntimeError(f"{e}")
+
+    try:
+        # patterns are compiled once, for all pages
+        tags_filter = PatternFilter(
+            parse_patterns(regex), parse_patterns(exclude_regex), perform_match_method.value)
+    except re.error as e:
+        raise RuntimeError(f"Invalid regex: {e}")
+    print(f"::debug::Filtering tags with {regex!r}, excluding {exclude_regex!r}, via {perform_match_method}")
+
     request_data = FetchRequestData(
         package_type=package_type,
         package_name=package_name,
@@ -137,18 +221,59 @@ def main():
         attempts_limit=attempts_limit
     )
 
-    request_response = fetch_package_metadata(request_data)
-    container_tags = get_tags_list(request_response)
-
-    if (regex != ""):
-        container_tags = apply_regex_to_tags(
-            regex, container_tags, perform_match_method)
+    container_tags = []
+    container_tags_groups = {}
+    seen_tags = set()
+    with requests.Session() as session, RequestTrace(trace_file, "Fetch Container Tags Requests") as trace:
+        session.headers.update(request_data.get_request_headers())
+        cache = None
+        if cache_dir:
+            cache = ResponseCache(
+                cache_dir,
+                max_size_bytes=int(os.environ.get("INPUT_CACHE_MAX_SIZE_MB") or 64) * 1024 * 1024,
+                ttl_seconds=int(os.environ.get("INPUT_CACHE_TTL_MINUTES") or 1440) * 60,
+            )
+        scheduler = RequestScheduler(
+            session, request_data.attempts_limit, burst=MAX_PARALLEL_REQUESTS, cache=cache, trace=trace)
+
+        pages = fetch_package_metadata(request_data, scheduler)
+        for page in pages:
+            page_tags = get_tags_list(page, seen_tags)
+            if tags_filter:
+                page_tags, page_groups = tags_filter.filter_with_groups(page_tags)
+                container_tags_groups.update(page_groups)
+            container_tags += page_tags
+            if limit and len(container_tags) >= limit:
+                print(f"::debug::Found {limit} matching tags, skipping the rest of pages")
+                container_tags = container_tags[:limit]
+                break
+        # cancels pages which aren't fetched yet
+        pages.close()
+
+    if tags_selector != SupportedTagsSelector.ALL:
+        print(f"::debug::Selecting {tags_selector} of {len(container_tags)} tags")
+        container_tags = select_tags(container_tags, tags_selector.value, top_n, include_pre_releases)
+    elif sort_method == SupportedSortMethod.SEMVER:
+        container_tags = sort_tags(container_tags)
+
+    if perform_match_method == SupportedMatchMethod.FINDALL:
+        container_tags_groups = {tag: container_tags_groups[tag] for tag in container_tags if tag in container_tags_groups}
 
     print("::group::Parse Semver Outputs")
     print(f"container-tags={container_tags}")
+    if perform_match_method == SupportedMatchMethod.FINDALL:
+        print(f"container-tags-groups={json.dumps(container_tags_groups)}")
+    print(f"request-wait-seconds={scheduler.total_wait_seconds:.2f}")
+    if cache:
+        print(f"cache-hits={cache.hits}")
     print("::endgroup::")
 
     set_output("container-tags", container_tags)
+    if perform_match_method == SupportedMatchMethod.FINDALL:
+        set_output("container-tags-groups", json.dumps(container_tags_groups, separators=(",", ":")))
+    set_output("request-wait-seconds", f"{scheduler.total_wait_seconds:.2f}")
+    if cache:
+        set_output("cache-hits", cache.hits)
 
 
 if __name__ == "__main__":
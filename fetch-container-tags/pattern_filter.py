@@ -0,0 +1,113 @@
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+MATCH = "match"
+SEARCH = "search"
+FINDALL = "findall"
+
+# a pattern made of plain and escaped characters only matches itself (`1\.` does, `1.` doesn't)
+LITERAL_PATTERN = re.compile(r"(\^?)((?:[^.^$*+?{}\[\]\\|()]|\\[^A-Za-z0-9])*)")
+# combining patterns renumbers their groups, which breaks back-references
+BACKREFERENCE_PATTERN = re.compile(r"\\[1-9]|\(\?P=")
+
+
+def parse_patterns(patterns_input: str) -> List[str]:
+    """
+    Splits an action input into patterns, one per line. Empty lines are ignored.
+    """
+    return [pattern for pattern in patterns_input.splitlines() if pattern.strip()]
+
+
+def compile_patterns(patterns: List[str], method: str) -> Optional[Callable[[str], bool]]:
+    """
+    Compiles patterns once into a single check, true when any of the patterns matches a name:
+    - literal patterns become a `str.startswith` check when anchored (by `match` or `^`),
+      a substring check otherwise
+    - other patterns are combined into a single alternation, or checked one by one
+      when they can't be combined (back-references, global flags, duplicate group names)
+    """
+    if not patterns:
+        return None
+
+    prefixes = []
+    substrings = []
+    regexes = []
+    for pattern in patterns:
+        literal_match = LITERAL_PATTERN.fullmatch(pattern)
+        if literal_match is None:
+            regexes.append(pattern)
+            continue
+        anchor, literal = literal_match.groups()
+        literal = re.sub(r"\\(.)", r"\1", literal)
+        if anchor or method == MATCH:
+            prefixes.append(literal)
+        else:
+            substrings.append(literal)
+
+    checks = []
+    if prefixes:
+        prefixes = tuple(prefixes)
+        checks.append(lambda name: name.startswith(prefixes))
+    if substrings:
+        checks.append(lambda name: any(substring in name for substring in substrings))
+    checks.extend(compile_regexes(regexes, method))
+
+    if len(checks) == 1:
+        return checks[0]
+    return lambda name: any(check(name) for check in checks)
+
+
+def compile_regexes(regexes: List[str], method: str) -> List[Callable[[str], bool]]:
+    if len(regexes) > 1 and not any(BACKREFERENCE_PATTERN.search(regex) for regex in regexes):
+        try:
+            combined = re.compile("|".join(f"(?:{regex})" for regex in regexes))
+        except re.error:
+            # global flags are only allowed at the start of the whole expression, group names have to be unique
+            pass
+        else:
+            return [combined.match if method == MATCH else combined.search]
+
+    compiled = [re.compile(regex) for regex in regexes]
+    return [regex.match if method == MATCH else regex.search for regex in compiled]
+
+
+class PatternFilter:
+    """
+    Filters names (tags, branches) with include and exclude regex patterns, compiled once.
+    A name is kept when it matches any include pattern (or there are none) and no exclude pattern.
+    With `findall`, include patterns are searched anywhere in names and return the groups they capture.
+    """
+
+    def __init__(self, include: List[str], exclude: List[str], method: str):
+        self.method = method
+        # `findall` finds something exactly when `search` does
+        check_method = SEARCH if method == FINDALL else method
+        self.include = compile_patterns(include, check_method)
+        self.exclude = compile_patterns(exclude, check_method)
+        # captured groups depend on each pattern's own groups, they aren't combined
+        self.findall_regexes = [re.compile(pattern) for pattern in include] if method == FINDALL else []
+
+    def __bool__(self) -> bool:
+        return self.include is not None or self.exclude is not None
+
+    def findall(self, name: str) -> list:
+        return [found for regex in self.findall_regexes for found in regex.findall(name)]
+
+    def filter(self, names: Iterable[str]) -> List[str]:
+        if self.include is not None:
+            names = filter(self.include, names)
+        if self.exclude is not None:
+            names = (name for name in names if not self.exclude(name))
+        return list(names)
+
+    def filter_with_groups(self, names: Iterable[str]) -> Tuple[List[str], Dict[str, list]]:
+        """
+        Filters names, returning kept names along with what `findall` found in each of them.
+        """
+        kept_names = self.filter(names)
+        groups = {}
+        if self.method == FINDALL:
+            for name in kept_names:
+                # several groups are found as tuples, serialized as lists
+                groups[name] = [list(found) if isinstance(found, tuple) else found for found in self.findall(name)]
+        return kept_names, groups
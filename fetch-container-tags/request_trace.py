@@ -0,0 +1,138 @@
+import json
+import math
+import os
+import threading
+import time
+from typing import List, Optional
+from urllib.parse import urlparse
+
+# response headers recorded along with every request, GitHub sends the X-RateLimit-* ones
+RATE_LIMIT_HEADERS = (
+    "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Used", "X-RateLimit-Reset", "X-RateLimit-Resource",
+    "Retry-After",
+)
+
+
+def get_rate_limit(headers) -> dict:
+    """
+    Picks the rate limit headers of a response, keyed by their lowercase name.
+    Works with the case-insensitive headers of requests, httpx and urllib responses.
+    """
+    if headers is None:
+        return {}
+    rate_limit = {}
+    for name in RATE_LIMIT_HEADERS:
+        value = headers.get(name)
+        if value is not None:
+            rate_limit[name.lower()] = value
+    return rate_limit
+
+
+def get_percentile(sorted_values: List[float], percentile: float) -> float:
+    # nearest rank, good enough for the handful of requests an action sends
+    return sorted_values[max(0, math.ceil(percentile / 100 * len(sorted_values)) - 1)]
+
+
+class RequestTrace:
+    """
+    Records every HTTP call: URL template, status, latency, response bytes, retry count and rate limit headers.
+    - records are appended to `trace_file` as JSON lines once each call completes, steps can share the file
+    - `write_step_summary` adds a table per URL template, slowest first, to the step summary
+    - calls failing without a response are recorded with a `null` status and the error type
+    Safe to use from concurrent threads.
+    """
+
+    def __init__(self, trace_file: str = "", title: str = "Requests"):
+        self.title = title
+        self.records = []
+        # steps of a job are told apart by their id
+        self._step = os.environ.get("GITHUB_ACTION", "")
+        self._lock = threading.Lock()
+        self._file = open(trace_file, "a") if trace_file else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.write_step_summary()
+        self.close()
+
+    def record(self, method: str, url: str, status: Optional[int], started_at: float, bytes_received: int = 0,
+               retry: int = 0, headers=None, url_template: Optional[str] = None, error: Optional[str] = None) -> dict:
+        """
+        Records a call sent at `started_at` (`time.perf_counter()`), which is done now.
+        `url_template` groups calls in the summary, the URL path is used when it's not provided.
+        """
+        record = {
+            "time": round(time.time(), 3),
+            "step": self._step,
+            "method": method,
+            "url_template": url_template or urlparse(url).path,
+            "url": url,
+            "status": status,
+            "latency_ms": round((time.perf_counter() - started_at) * 1000, 1),
+            "bytes": bytes_received,
+            "retry": retry,
+            "rate_limit": get_rate_limit(headers),
+        }
+        if error:
+            record["error"] = error
+        with self._lock:
+            self.records.append(record)
+            if self._file:
+                self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+                self._file.flush()
+        return record
+
+    def get_summary(self) -> str:
+        """
+        Markdown table of the calls grouped by method and URL template, the most time spent first.
+        """
+        with self._lock:
+            records = list(self.records)
+        groups = {}
+        for record in records:
+            groups.setdefault((record["method"], record["url_template"]), []).append(record)
+
+        rows = []
+        for (method, url_template), group in groups.items():
+            latencies = sorted(record["latency_ms"] for record in group)
+            remaining = [int(record["rate_limit"]["x-ratelimit-remaining"]) for record in group
+                         if record["rate_limit"].get("x-ratelimit-remaining", "").isdigit()]
+            rows.append((sum(latencies), (
+                f"`{method} {url_template}`",
+                len(group),
+                sum(1 for record in group if record["status"] is None or record["status"] >= 400),
+                sum(1 for record in group if record["retry"]),
+                f"{get_percentile(latencies, 50):.0f}",
+                f"{get_percentile(latencies, 95):.0f}",
+                f"{latencies[-1]:.0f}",
+                f"{sum(latencies):.0f}",
+                f"{sum(record['bytes'] for record in group) / 1024:.1f}",
+                min(remaining) if remaining else "",
+            )))
+        rows.sort(key=lambda row: row[0], reverse=True)
+
+        lines = [
+            f"### {self.title}",
+            "",
+            "|Request|Calls|Errors|Retries|p50 ms|p95 ms|Max ms|Total ms|KB|Rate limit remaining|",
+            "|-|-|-|-|-|-|-|-|-|-|",
+        ]
+        lines += ["|" + "|".join(str(cell) for cell in row) + "|" for _, row in rows]
+        return "\n".join(lines) + "\n"
+
+    def write_step_summary(self, summary_file: Optional[str] = None) -> None:
+        """
+        Appends the summary to `summary_file`, `GITHUB_STEP_SUMMARY` by default. Nothing is written without calls.
+        """
+        summary_file = summary_file or os.environ.get("GITHUB_STEP_SUMMARY")
+        if not summary_file or not self.records:
+            return
+        with open(summary_file, "a") as f:
+            f.write(self.get_summary() + "\n")
+
+    def close(self) -> None:
+        if self._file:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+import time
+from hashlib import sha256
+from typing import Optional
+
+import requests
+
+# Response headers which are restored along with the cached body
+CACHED_HEADERS = ("Content-Type", "Link")
+
+
+class ResponseCache:
+    """
+    On-disk cache of GitHub API responses for conditional requests, safe to persist with actions/cache.
+    Entries are keyed by URL, query parameters and the credentials used, and stored with their ETag.
+    Persisted entries are only hit by runs using the same token, never with the per-job `GITHUB_TOKEN`.
+    GitHub doesn't count `304 Not Modified` responses against the primary rate limit.
+    Entries unused for longer than `ttl_seconds` are dropped, and least recently used entries
+    are evicted once the cache grows over `max_size_bytes`.
+    """
+
+    def __init__(self, cache_dir: str, max_size_bytes: int, ttl_seconds: int):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def get_key(self, url: str, params: Optional[dict], authorization: Optional[str]) -> str:
+        key = json.dumps({
+            "url": url,
+            "params": {name: str(value) for name, value in (params or {}).items()},
+            # responses depend on what the token can see, the token itself is never stored
+            "authorization": sha256((authorization or "").encode("utf-8")).hexdigest(),
+        }, sort_keys=True)
+        return sha256(key.encode("utf-8")).hexdigest()
+
+    def load(self, key: str) -> Optional[dict]:
+        path = self._get_entry_path(key)
+        try:
+            if time.time() - os.stat(path).st_mtime > self.ttl_seconds:
+                os.remove(path)
+                return None
+            with open(path) as f:
+                entry = json.load(f)
+            # mark the entry as recently used
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def store(self, key: str, response: requests.Response) -> None:
+        etag = response.headers.get("ETag")
+        if not etag:
+            return
+        entry = {
+            "url": response.url,
+            "etag": etag,
+            "headers": {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers},
+            "body": response.text,
+        }
+        path = self._get_entry_path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def restore(self, response: requests.Response, entry: dict) -> requests.Response:
+        """
+        Turns a `304 Not Modified` response into the cached response.
+        """
+        response.status_code = 200
+        response.headers.update(entry["headers"])
+        response._content = entry["body"].encode("utf-8")
+        response.encoding = "utf-8"
+        with self._lock:
+            self.hits += 1
+        return response
+
+    def evict(self) -> None:
+        with self._lock:
+            now = time.time()
+            entries = []
+            total_size = 0
+            for file_name in os.listdir(self.cache_dir):
+                if not file_name.endswith(".json"):
+                    continue
+                path = os.path.join(self.cache_dir, file_name)
+                try:
+                    stat = os.stat(path)
+                    if now - stat.st_mtime > self.ttl_seconds:
+                        os.remove(path)
+                        continue
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total_size += stat.st_size
+
+            for _, size, path in sorted(entries):
+                if total_size <= self.max_size_bytes:
+                    break
+                print(f"::debug::Evicting {path} from response cache")
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total_size -= size
+
+    def _get_entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
@@ -0,0 +1,75 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from packaging.version import Version
+
+ALL = "all"
+LATEST = "latest"
+LATEST_PER_MINOR = "latest-per-minor"
+TOP_N = "top-n"
+
+
+@lru_cache(maxsize=None)
+def parse_tag_version(tag: str) -> Optional["Version"]:
+    """
+    Parses a tag into a version, once per tag. Returns None for tags which aren't versions (`latest`, `1.7.latest`).
+    """
+    # versions start with a digit, optionally prefixed with `v`, other tags are skipped without parsing them
+    if not tag[:1].isdigit() and not (tag[:1] in "vV" and tag[1:2].isdigit()):
+        return None
+    # imported on first use, runs which don't sort or select tags by version don't load packaging
+    from packaging.version import InvalidVersion, Version
+    try:
+        return Version(tag)
+    except InvalidVersion:
+        return None
+
+
+def get_versioned_tags(tags: Iterable[str], include_pre_releases: bool = True) -> List[Tuple["Version", str]]:
+    """
+    Tags which are versions along with their versions, newest first.
+    Tags of the same version (`1.7.0`, `v1.7.0`) keep their order.
+    """
+    versioned_tags = []
+    for tag in tags:
+        version = parse_tag_version(tag)
+        if version is not None and (include_pre_releases or not version.is_prerelease):
+            versioned_tags.append((version, tag))
+    versioned_tags.sort(key=lambda versioned_tag: versioned_tag[0], reverse=True)
+    return versioned_tags
+
+
+def sort_tags(tags: List[str]) -> List[str]:
+    """
+    Sorts version tags newest first, other tags follow in their order.
+    """
+    sorted_tags = [tag for _, tag in get_versioned_tags(tags)]
+    sorted_tags += [tag for tag in tags if parse_tag_version(tag) is None]
+    return sorted_tags
+
+
+def select_tags(tags: List[str], selector: str, top_n: int = 1, include_pre_releases: bool = False) -> List[str]:
+    """
+    Selects version tags, newest first:
+    - `all`: all of them
+    - `latest`: the newest one
+    - `latest-per-minor`: the newest one of every `major.minor` line
+    - `top-n`: the `top_n` newest ones
+    Tags which aren't versions are left out.
+    """
+    versioned_tags = get_versioned_tags(tags, include_pre_releases)
+    if selector == LATEST:
+        return [tag for _, tag in versioned_tags[:1]]
+    if selector == TOP_N:
+        return [tag for _, tag in versioned_tags[:top_n]]
+    if selector == LATEST_PER_MINOR:
+        selected_tags = []
+        seen_lines = set()
+        for version, tag in versioned_tags:
+            line = (version.major, version.minor)
+            if line not in seen_lines:
+                seen_lines.add(line)
+                selected_tags.append(tag)
+        return selected_tags
+    return [tag for _, tag in versioned_tags]
@@ -2,9 +2,47 @@ import requests
 import re
 import os
 import json
-import time
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from dataclasses import dataclass
+from typing import Iterator, Optional
+from urllib.parse import parse_qs, urlparse
+from pattern_filter import PatternFilter, parse_patterns
+from request_scheduler import RequestScheduler
+from request_trace import RequestTrace
+from response_cache import ResponseCache
+
+# set by GitHub Actions runners (to the GitHub Enterprise Server API there), can point to a local stand-in
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com")
+GITHUB_GRAPHQL_URL = os.environ.get("GITHUB_GRAPHQL_URL", f"{GITHUB_API_URL}/graphql")
+# GitHub API doesn't return more than 100 items per page
+BRANCHES_PER_PAGE = 100
+MAX_PARALLEL_REQUESTS = 4
+
+BRANCHES_QUERY = """
+    query($owner: String!, $name: String!, $per_page: Int!, $cursor: String) {
+        repository(owner: $owner, name: $name) {
+            refs(refPrefix: "refs/heads/", first: $per_page, after: $cursor) {
+                pageInfo {
+                    hasNextPage
+                    endCursor
+                }
+                nodes {
+                    name
+                    branchProtectionRule {
+                        id
+                    }
+                    target {
+                        oid
+                        ... on Commit {
+                            committedDate
+                        }
+                    }
+                }
+            }
+        }
+    }
+"""
 
 
 class ProvidedMatchMethodNotSupportedOrIncorrect(Exception):
@@ -12,6 +50,16 @@ class ProvidedMatchMethodNotSupportedOrIncorrect(Exception):
     pass
 
 
+class ProvidedApiNotSupportedOrIncorrect(Exception):
+    """The specified API is not supported or incorrect"""
+    pass
+
+
+class GraphQLRequestError(Exception):
+    """GitHub GraphQL API returned errors for the query"""
+    pass
+
+
 @dataclass
 class FetchRequestData:
     repo_name: str
@@ -25,12 +73,40 @@ class FetchRequestData:
         Description: Fetch branches metadata for specific repo
         GH API doc: https://docs.github.com/en/rest/branches/branches?apiVersion=2022-11-28#list-branches
         """
-        url = f"https://api.github.com/repos/{self.organization}/{self.repo_name}/branches"
+        url = f"{GITHUB_API_URL}/repos/{self.organization}/{self.repo_name}/branches"
         return url
 
+    def get_request_url_template(self) -> str:
+        """
+        Description: Request URL without the organization and repo, groups requests in the trace
+        """
+        url_template = "/repos/{organization}/{repo_name}/branches"
+        return url_template
+
+    def get_graphql_request_url(self) -> str:
+        """
+        Description: Fetch branches with their head commit and protection rule in a single query
+        GH API doc: https://docs.github.com/en/graphql/reference/objects#ref
+        """
+        url = GITHUB_GRAPHQL_URL
+        return url
+
+    def get_graphql_request_body(self, cursor: Optional[str] = None) -> dict:
+        body = {
+            "query": BRANCHES_QUERY,
+            "variables": {
+                "owner": self.organization,
+                "name": self.repo_name,
+                "per_page": BRANCHES_PER_PAGE,
+                "cursor": cursor,
+            },
+        }
+        return body
+
     def get_request_parameters(self) -> dict:
         parameters = {
-            "protected": self.protected_branches_only
+            "protected": self.protected_branches_only,
+            "per_page": BRANCHES_PER_PAGE,
         }
         return parameters
 
@@ -49,53 +125,115 @@ class SupportedMatchMethod(Enum):
     FINDALL = 'findall'
 
 
+class SupportedApi(Enum):
+    REST = 'rest'
+    GRAPHQL = 'graphql'
+
+
 def set_output(name, value):
     with open(os.environ["GITHUB_OUTPUT"], "a") as f:
         f.write(f"{name}={value}\n")
 
 
-def get_exponential_backoff_in_seconds(attempt_number: int) -> int:
+def get_last_page_number(response: requests.Response) -> int:
+    """
+    Reads the number of the last page from the `Link` header.
+    Returns 1 if the response isn't paginated.
+    """
+    last_page_url = response.links.get("last", {}).get("url")
+    if last_page_url is None:
+        return 1
+    return int(parse_qs(urlparse(last_page_url).query)["page"][0])
+
+
+def fetch_branches_page(scheduler: RequestScheduler, request_data: FetchRequestData, page: int) -> requests.Response:
+    print(f"::debug::Fetching page {page} of branches")
+    parameters: dict = {**request_data.get_request_parameters(), "page": page}
+    return scheduler.request("GET", request_data.get_request_url(), params=parameters,
+                             url_template=request_data.get_request_url_template())
+
+
+def get_branch_metadata(branch: dict) -> dict:
+    """
+    Description: Converts a branch from REST API response
+    GH API doc: https://docs.github.com/en/rest/branches/branches?apiVersion=2022-11-28#list-branches
+    """
+    return {
+        "name": branch["name"],
+        "sha": branch.get("commit", {}).get("sha"),
+        "committed_date": None,
+        "protected": branch.get("protected", False),
+    }
+
+
+def get_graphql_branch_metadata(ref: dict) -> dict:
+    """
+    Description: Converts a ref node from GraphQL API response
+    GH API doc: https://docs.github.com/en/graphql/reference/objects#ref
+    """
+    return {
+        "name": ref["name"],
+        "sha": ref["target"]["oid"],
+        "committed_date": ref["target"].get("committedDate"),
+        "protected": ref["branchProtectionRule"] is not None,
+    }
+
+
+def fetch_repo_branches(request_data: FetchRequestData, scheduler: RequestScheduler) -> Iterator[list]:
     """
-    Returns exponential back-off - depending on number of attempt.
-    Considers that `attempt_number` starts from 0.
-    Initial back-off - 4 second.
+    Yields branches metadata page by page, in the order of pages.
+    The first page tells how many pages there are,
+    the rest of them are fetched concurrently through the shared scheduler.
     """
-    return pow(attempt_number + 2, 2)
-
-
-def fetch_repo_branches(request_data: FetchRequestData):
-    url: str = request_data.get_request_url()
-    headers: dict = request_data.get_request_headers()
-    parameters: dict = request_data.get_request_parameters()
-
-    print(f"::debug::Start fetching package metadata")
-
-    print(parameters)
-
-    for attempt in range(request_data.attempts_limit):
-        print(
-            f"::debug::Fetching package metadata - attempt {attempt + 1} / {request_data.attempts_limit}")
-        try:
-            response = requests.get(
-                url=url, params=parameters, headers=headers)
-            response.raise_for_status()
-        except requests.exceptions.RequestException as e:
-            if attempt == request_data.attempts_limit - 1:
-                raise RuntimeError(f"{e}")
-
-            if attempt < request_data.attempts_limit - 1:
-                print(
-                    f"Exception occurred: {type(e).__name__} - {e}. Retrying.")
-                back_off = get_exponential_backoff_in_seconds(attempt)
-                print(
-                    f"::debug::Sleep for {back_off} seconds before next attempt")
-                time.sleep(back_off)
-                continue
-        break
+    print(f"::debug::Start fetching branches metadata")
+
+    print(request_data.get_request_parameters())
+
+    first_page = fetch_branches_page(scheduler, request_data, 1)
+    last_page_number = get_last_page_number(first_page)
+    print(f"::debug::Fetching {last_page_number} pages of branches")
+    yield [get_branch_metadata(branch) for branch in first_page.json()]
+
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_REQUESTS) as executor:
+        pages = executor.map(
+            lambda page: fetch_branches_page(scheduler, request_data, page),
+            range(2, last_page_number + 1))
+        for page in pages:
+            yield [get_branch_metadata(branch) for branch in page.json()]
 
     print(f"::debug::Finish fetching metadata")
 
-    return response.json()
+
+def fetch_repo_branches_graphql(request_data: FetchRequestData, scheduler: RequestScheduler) -> Iterator[list]:
+    """
+    Yields branches metadata page by page, including head commit and protection status.
+    Every page is a single GraphQL query, the next page starts from the previous page end cursor.
+    """
+    print(f"::debug::Start fetching branches metadata via GraphQL API")
+
+    cursor = None
+    page = 1
+    while True:
+        print(f"::debug::Fetching page {page} of branches")
+        response = scheduler.request("POST", request_data.get_graphql_request_url(),
+                                     json=request_data.get_graphql_request_body(cursor))
+        response_data = response.json()
+        if response_data.get("errors"):
+            raise GraphQLRequestError(
+                "; ".join(error.get("message", "") for error in response_data["errors"]))
+
+        refs = response_data["data"]["repository"]["refs"]
+        branches = [get_graphql_branch_metadata(ref) for ref in refs["nodes"]]
+        if request_data.protected_branches_only:
+            branches = [branch for branch in branches if branch["protected"]]
+        yield branches
+
+        if not refs["pageInfo"]["hasNextPage"]:
+            break
+        cursor = refs["pageInfo"]["endCursor"]
+        page += 1
+
+    print(f"::debug::Finish fetching metadata")
 
 
 def get_branches_list(package_metadata) -> list:
@@ -105,24 +243,17 @@ def get_branches_list(package_metadata) -> list:
     return tags
 
 
-def apply_regex_to_list(regex: str, branches: list, perform_method: SupportedMatchMethod):
-    regex = re.compile(regex)
-    method: function = regex.match
-    if (perform_method == SupportedMatchMethod.FINDALL):
-        method = regex.match
-    if (perform_method == SupportedMatchMethod.SEARCH):
-        method = regex.search
-    print(f"::debug::Applying regex {regex} via {perform_method}")
-    return list(filter(method, branches))
-
-
 def main():
     repo_name = os.environ["INPUT_REPO_NAME"]
     organization = os.environ["INPUT_ORGANIZATION"]
     pat = os.environ["INPUT_PAT"]
     protected_branches_only = os.environ["INPUT_FETCH_PROTECTED_BRANCHES_ONLY"] == "true"
     attempts_limit = int(os.environ["INPUT_RETRIES"]) + 1
+    cache_dir = os.environ.get("INPUT_CACHE_DIR", "")
+    trace_file = os.environ.get("INPUT_TRACE_FILE", "")
+    api_input = os.environ.get("INPUT_API", "rest").upper()
     regex = ""
+    exclude_regex = os.environ.get("INPUT_EXCLUDE_REGEX", "")
     perform_match_method_input = ""
     perform_match_method = -1
 
@@ -140,6 +271,23 @@ def main():
     except Exception as e:
         raise RuntimeError(f"{e}")
 
+    try:
+        # patterns are compiled once, for all pages
+        branches_filter = PatternFilter(
+            parse_patterns(regex), parse_patterns(exclude_regex), perform_match_method.value)
+    except re.error as e:
+        raise RuntimeError(f"Invalid regex: {e}")
+    print(f"::debug::Filtering branches with {regex!r}, excluding {exclude_regex!r}, via {perform_match_method}")
+
+    try:
+        if hasattr(SupportedApi, api_input):
+            api = SupportedApi[api_input]
+        else:
+            raise ProvidedApiNotSupportedOrIncorrect(
+                f"API {api_input} is not supported or incorrect")
+    except Exception as e:
+        raise RuntimeError(f"{e}")
+
     request_data = FetchRequestData(
         repo_name=repo_name,
         organization=organization,
@@ -148,17 +296,50 @@ def main():
         attempts_limit=attempts_limit
     )
 
-    request_response = fetch_repo_branches(request_data)
-    branches = get_branches_list(request_response)
-
-    if (regex != ""):
-        branches = apply_regex_to_list(regex, branches, perform_match_method)
+    fetch_pages = fetch_repo_branches_graphql if api == SupportedApi.GRAPHQL else fetch_repo_branches
+
+    branches = []
+    branches_metadata = []
+    branches_groups = {}
+    with requests.Session() as session, RequestTrace(trace_file, "Fetch Repo Branches Requests") as trace:
+        session.headers.update(request_data.get_request_headers())
+        cache = None
+        if cache_dir:
+            cache = ResponseCache(
+                cache_dir,
+                max_size_bytes=int(os.environ.get("INPUT_CACHE_MAX_SIZE_MB") or 64) * 1024 * 1024,
+                ttl_seconds=int(os.environ.get("INPUT_CACHE_TTL_MINUTES") or 1440) * 60,
+            )
+        scheduler = RequestScheduler(
+            session, request_data.attempts_limit, burst=MAX_PARALLEL_REQUESTS, cache=cache, trace=trace)
+
+        for page in fetch_pages(request_data, scheduler):
+            page_branches = get_branches_list(page)
+            if branches_filter:
+                page_branches, page_groups = branches_filter.filter_with_groups(page_branches)
+                branches_groups.update(page_groups)
+                matched_branches = set(page_branches)
+                page = [branch for branch in page if branch["name"] in matched_branches]
+            branches += page_branches
+            branches_metadata += page
 
     print("::group::Parse Semver Outputs")
     print(f"repo-branches={branches}")
+    print(f"repo-branches-metadata={json.dumps(branches_metadata)}")
+    if perform_match_method == SupportedMatchMethod.FINDALL:
+        print(f"repo-branches-groups={json.dumps(branches_groups)}")
+    print(f"request-wait-seconds={scheduler.total_wait_seconds:.2f}")
+    if cache:
+        print(f"cache-hits={cache.hits}")
     print("::endgroup::")
 
     set_output("repo-branches", branches)
+    set_output("repo-branches-metadata", json.dumps(branches_metadata, separators=(",", ":")))
+    if perform_match_method == SupportedMatchMethod.FINDALL:
+        set_output("repo-branches-groups", json.dumps(branches_groups, separators=(",", ":")))
+    set_output("request-wait-seconds", f"{scheduler.total_wait_seconds:.2f}")
+    if cache:
+        set_output("cache-hits", cache.hits)
 
 
 if __name__ == "__main__":
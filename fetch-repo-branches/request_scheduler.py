@@ -0,0 +1,184 @@
+import random
+import threading
+import time
+from typing import Optional
+
+import requests
+from request_trace import RequestTrace
+from response_cache import ResponseCache
+
+# Secondary rate limits don't always come with headers, GitHub asks to wait at least a minute
+# https://docs.github.com/en/rest/using-the-rest-api/rate-limits-for-the-rest-api#handle-rate-limit-errors-appropriately
+DEFAULT_RATE_LIMIT_WAIT_SECONDS = 60
+MAX_RATE_LIMIT_WAIT_SECONDS = 15 * 60
+MAX_BACKOFF_SECONDS = 30
+
+
+def get_jittered_backoff_in_seconds(attempt_number: int) -> float:
+    """
+    Returns exponential back-off with full jitter - depending on number of attempt.
+    Considers that `attempt_number` starts from 0.
+    Back-off is picked between 0 and 2 ** (attempt_number + 1) seconds, up to 30 seconds.
+    """
+    return random.uniform(0, min(MAX_BACKOFF_SECONDS, pow(2, attempt_number + 1)))
+
+
+def is_rate_limited(response: requests.Response) -> bool:
+    if response.status_code == 429:
+        return True
+    # secondary rate limits can come without either header, their message tells them from other 403s
+    return response.status_code == 403 and (
+        "Retry-After" in response.headers or response.headers.get("X-RateLimit-Remaining") == "0"
+        or "rate limit" in response.text.lower())
+
+
+class TokenBucket:
+    """
+    Paces concurrent callers to `rate` requests per second on average,
+    allowing bursts of up to `capacity` requests.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Takes a token, waiting until one is available.
+        Returns seconds spent waiting.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            # the token is reserved right away, so callers queue up in order
+            self._tokens -= 1
+            wait = max(0.0, -self._tokens / self.rate)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class RequestScheduler:
+    """
+    Sends requests to GitHub API on behalf of concurrent callers.
+    - requests are paced with a token bucket
+    - once the rate limit is exhausted, every caller waits for `X-RateLimit-Reset`
+    - rate limited responses are retried after `Retry-After` or `X-RateLimit-Reset`, a minute without them
+    - server errors and connection errors are retried with jittered back-off
+    - other client errors (auth, not found, validation) fail right away
+    - GET requests are sent with `If-None-Match` when `cache` has the response,
+      and `304 Not Modified` responses are served from `cache`
+    - every attempt is recorded in `trace`, grouped by `url_template`
+    """
+
+    def __init__(self, session: requests.Session, attempts_limit: int,
+                 requests_per_second: float = 10.0, burst: int = 4, cache: Optional[ResponseCache] = None,
+                 trace: Optional[RequestTrace] = None):
+        self.session = session
+        self.attempts_limit = attempts_limit
+        self.cache = cache
+        self.trace = trace
+        self.total_wait_seconds = 0.0
+        self._bucket = TokenBucket(requests_per_second, burst)
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, url_template: Optional[str] = None, **kwargs) -> requests.Response:
+        cache_key = None
+        cache_entry = None
+        if self.cache is not None and method == "GET":
+            cache_key = self.cache.get_key(
+                url, kwargs.get("params"), self.session.headers.get("Authorization"))
+            cache_entry = self.cache.load(cache_key)
+            if cache_entry is not None:
+                kwargs["headers"] = {**kwargs.get("headers", {}), "If-None-Match": cache_entry["etag"]}
+
+        for attempt in range(self.attempts_limit):
+            is_last_attempt = attempt == self.attempts_limit - 1
+            print(
+                f"::debug::Sending {method} {url} - attempt {attempt + 1} / {self.attempts_limit}")
+            self._wait_for_rate_limit_reset()
+            self._add_wait(self._bucket.acquire())
+
+            started_at = time.perf_counter()
+            try:
+                response = self.session.request(method=method, url=url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if self.trace:
+                    self.trace.record(method, url, None, started_at, retry=attempt, url_template=url_template,
+                                      error=type(e).__name__)
+                if is_last_attempt:
+                    raise RuntimeError(f"{e}")
+                print(f"Exception occurred: {type(e).__name__} - {e}. Retrying.")
+                self._sleep(get_jittered_backoff_in_seconds(attempt))
+                continue
+
+            if self.trace:
+                self.trace.record(method, url, response.status_code, started_at, len(response.content), attempt,
+                                  response.headers, url_template)
+            self._update_rate_limit(response)
+            if response.status_code == 304 and cache_entry is not None:
+                print(f"::debug::{url} is not modified, using cached response")
+                return self.cache.restore(response, cache_entry)
+            if response.ok:
+                if cache_key is not None:
+                    self.cache.store(cache_key, response)
+                return response
+
+            if is_rate_limited(response) and not is_last_attempt:
+                wait = self._get_rate_limit_wait(response)
+                if wait <= MAX_RATE_LIMIT_WAIT_SECONDS:
+                    print(f"Rate limit exceeded for {url}. Retrying.")
+                    self._sleep(wait)
+                    continue
+            elif response.status_code >= 500 and not is_last_attempt:
+                print(f"Server error occurred: {response.status_code} {response.reason} for {url}. Retrying.")
+                self._sleep(get_jittered_backoff_in_seconds(attempt))
+                continue
+
+            try:
+                response.raise_for_status()
+            except requests.exceptions.HTTPError as e:
+                raise RuntimeError(f"{e}")
+
+        raise RuntimeError(f"Could not complete {method} {url} in {self.attempts_limit} attempts")
+
+    def _get_rate_limit_wait(self, response: requests.Response) -> float:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None and retry_after.isdigit():
+            return float(retry_after)
+        reset = response.headers.get("X-RateLimit-Reset")
+        if response.headers.get("X-RateLimit-Remaining") == "0" and reset is not None and reset.isdigit():
+            return max(0.0, int(reset) - time.time()) + 1
+        return DEFAULT_RATE_LIMIT_WAIT_SECONDS
+
+    def _update_rate_limit(self, response: requests.Response) -> None:
+        reset = response.headers.get("X-RateLimit-Reset")
+        if response.headers.get("X-RateLimit-Remaining") != "0" or reset is None or not reset.isdigit():
+            return
+        with self._lock:
+            # `X-RateLimit-Reset` is in UTC epoch seconds
+            self._blocked_until = max(self._blocked_until, float(reset) + 1)
+
+    def _wait_for_rate_limit_reset(self) -> None:
+        with self._lock:
+            wait = self._blocked_until - time.time()
+        if wait > MAX_RATE_LIMIT_WAIT_SECONDS:
+            raise RuntimeError(
+                f"Rate limit is exhausted and resets in {wait:.0f} seconds")
+        if wait > 0:
+            print(f"::debug::Rate limit is exhausted, waiting {wait:.0f} seconds for reset")
+            self._sleep(wait)
+
+    def _sleep(self, seconds: float) -> None:
+        print(f"::debug::Sleep for {seconds:.2f} seconds")
+        time.sleep(seconds)
+        self._add_wait(seconds)
+
+    def _add_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.total_wait_seconds += seconds
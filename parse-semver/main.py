@@ -1,4 +1,7 @@
+import json
 import os
+from functools import lru_cache
+from typing import Dict, List
 from packaging.version import parse, Version
 
 
@@ -11,12 +14,27 @@ def get_next_minor_version(version: Version) -> Version:
     next_minor = version.minor + 1
     return Version(f"{version.major}.{next_minor}.0a1")
 
-def main():
-    input_version = os.environ["INPUT_VERSION"]
+
+def get_next_release_versions(version: Version) -> Dict[str, str]:
+    return {
+        "next-patch-version": f"{version.major}.{version.minor}.{version.micro + 1}",
+        "next-minor-version": f"{version.major}.{version.minor + 1}.0",
+        "next-major-version": f"{version.major + 1}.0.0",
+    }
+
+
+@lru_cache(maxsize=None)
+def parse_version(input_version: str) -> Version:
+    """
+    Parses a version string, once per distinct string.
+    """
     parsed_version = parse(input_version)
     assert parsed_version.release, f"Not a valid version: {input_version}"
     assert isinstance(parsed_version, Version)
+    return parsed_version
+
 
+def get_version_outputs(parsed_version: Version) -> dict:
     # ('rc', 2) -> pre_release_type = rc, pre_release_version = 2
     pre_release_type, pre_release_version = (
         parsed_version.pre
@@ -31,29 +49,102 @@ def main():
 
     next_parsed_version = get_next_minor_version(parsed_version)
 
-    print("::group::Parse Semver Outputs")
-    print(f"version={parsed_version.public}")
-    print(f"next-minor-alpha-version={next_parsed_version.public}")
-    print(f"base-version={parsed_version.base_version}")
-    print(f"major={parsed_version.major}")
-    print(f"minor={parsed_version.minor}")
-    print(f"patch={parsed_version.micro}")
-    print(f"pre-release-type={pre_release_type}")
-    print(f"pre-release-version={pre_release_version}")
-    print(f"pre-release={pre_release}")
-    print(f"is-pre-release={is_pre_release_truthy}")
-    print("::endgroup::")
-
-    set_output("version", parsed_version.public)
-    set_output("next-minor-alpha-version", next_parsed_version.public)
-    set_output("base-version", parsed_version.base_version)
-    set_output("major", parsed_version.major)
-    set_output("minor", parsed_version.minor)
-    set_output("patch", parsed_version.micro)
-    set_output("pre-release-type", pre_release_type)
-    set_output("pre-release-version", pre_release_version)
-    set_output("pre-release", pre_release)
-    set_output("is-pre-release", is_pre_release_truthy)
+    return {
+        "version": parsed_version.public,
+        "next-minor-alpha-version": next_parsed_version.public,
+        "base-version": parsed_version.base_version,
+        "major": parsed_version.major,
+        "minor": parsed_version.minor,
+        "patch": parsed_version.micro,
+        "pre-release-type": pre_release_type,
+        "pre-release-version": pre_release_version,
+        "pre-release": pre_release,
+        "is-pre-release": is_pre_release_truthy,
+    }
+
+
+def parse_versions_input(versions: str) -> List[str]:
+    """
+    Splits a list of versions separated by newlines or commas.
+    """
+    return [version.strip() for version in versions.replace(",", "\n").splitlines() if version.strip()]
+
+
+def get_release_lines(sorted_versions: List[Version]) -> Dict[str, dict]:
+    """
+    Newest stable version and pre-release of every `major.minor` line, along with its next patch version
+    (or the version its pre-releases lead to, when the line has no stable version yet).
+    """
+    release_lines = {}
+    latest_stable_versions = {}
+    for parsed_version in sorted_versions:
+        line = f"{parsed_version.major}.{parsed_version.minor}"
+        release_line = release_lines.setdefault(line, {"latest": "", "latest-pre-release": "", "next-patch": ""})
+        if parsed_version.is_prerelease:
+            release_line["latest-pre-release"] = parsed_version.public
+        else:
+            release_line["latest"] = parsed_version.public
+            latest_stable_versions[line] = parsed_version
+
+    for line, release_line in release_lines.items():
+        if line in latest_stable_versions:
+            release_line["next-patch"] = get_next_release_versions(latest_stable_versions[line])["next-patch-version"]
+        else:
+            release_line["next-patch"] = Version(release_line["latest-pre-release"]).base_version
+    return release_lines
+
+
+def get_versions_outputs(input_versions: List[str]) -> dict:
+    # duplicates (`1.2.3`, `v1.2.3`) are the same version, the first one is kept
+    sorted_versions = sorted(dict.fromkeys(parse_version(version) for version in input_versions))
+    stable_versions = [version for version in sorted_versions if not version.is_prerelease]
+
+    outputs = {
+        "versions": [get_version_outputs(version) for version in sorted_versions],
+        "release-lines": get_release_lines(sorted_versions),
+        "latest-version": sorted_versions[-1].public,
+        "latest-stable-version": stable_versions[-1].public if stable_versions else "",
+    }
+    # next versions after the latest stable one
+    next_versions = get_next_release_versions(stable_versions[-1]) if stable_versions else {
+        "next-patch-version": "", "next-minor-version": "", "next-major-version": ""}
+    outputs.update(next_versions)
+    return outputs
+
+
+def serialize_output(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    return value
+
+
+def main():
+    input_version = os.environ.get("INPUT_VERSION", "")
+    input_versions = parse_versions_input(os.environ.get("INPUT_VERSIONS", ""))
+    if not input_version and not input_versions:
+        raise RuntimeError("Either `version` or `versions` input should be provided")
+
+    if input_version:
+        outputs = get_version_outputs(parse_version(input_version))
+
+        print("::group::Parse Semver Outputs")
+        for name, value in outputs.items():
+            print(f"{name}={value}")
+        print("::endgroup::")
+
+        for name, value in outputs.items():
+            set_output(name, value)
+
+    if input_versions:
+        outputs = get_versions_outputs(input_versions)
+
+        print("::group::Parse Semver Batch Outputs")
+        for name, value in outputs.items():
+            print(f"{name}={serialize_output(value)}")
+        print("::endgroup::")
+
+        for name, value in outputs.items():
+            set_output(name, serialize_output(value))
 
 
 if __name__ == "__main__":
@@ -1,13 +1,16 @@
-import codecs
 import json
 import os
 import time
-from packaging.version import Version
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from contextlib import closing
-from dataclasses import dataclass
-from typing import Optional
-from urllib.request import urlopen
-from hashlib import sha256
+from dataclasses import dataclass, field
+from typing import FrozenSet, Iterable, List, Optional, Tuple
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlparse
+from urllib.request import Request, urlopen
+from hashlib import blake2b, md5, sha256
+from metadata_cache import MetadataCache
+from request_trace import RequestTrace
 
 
 class PackageVersionNotFoundWarning(UserWarning):
@@ -24,6 +27,29 @@ class PackageVersionNotFoundInPyPIError(Exception):
     pass
 
 
+class InvalidPackageSpecError(Exception):
+    """The provided package spec can't be parsed"""
+    pass
+
+
+class ChecksumTypeNotSupportedError(Exception):
+    """The requested checksum type is not supported"""
+    pass
+
+
+# Checksum types use the same names as the `digests` provided by PyPI
+SUPPORTED_CHECKSUM_TYPES = {
+    "sha256": sha256,
+    "md5": md5,
+    "blake2b_256": lambda: blake2b(digest_size=32),
+}
+CHECKSUM_CHUNK_SIZE = 1024 * 1024
+
+# package indexes can be overridden, for instance with a mirror or a local stand-in
+PYPI_URL = os.environ.get("PYPI_URL", "https://pypi.io/pypi")
+TEST_PYPI_URL = os.environ.get("TEST_PYPI_URL", "https://test.pypi.org/pypi")
+
+
 @dataclass
 class PackageInfo:
     name: str
@@ -35,11 +61,57 @@ class PackageInfo:
     url: Optional[str]
     checksum: Optional[str]
     checksum_type: Optional[str]
+    checksums: Optional[dict]
+    artifacts: Optional[list]
+
+
+@dataclass
+class ArtifactFilter:
+    packagetypes: FrozenSet[str] = field(default_factory=frozenset)
+    python_tag: str = ""
+    platform_tag: str = ""
+    # interpreter and ABI tags of the wheels installable on `python_tag`
+    compatible_tags: FrozenSet[Tuple[str, str]] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.compatible_tags = get_compatible_tags(self.python_tag) if self.python_tag else frozenset()
+
+    def matches(self, artifact) -> bool:
+        """
+        Checks the artifact against every filter which is set.
+        Source distributions match any python and platform tag,
+        wheels installable on the python tag match it (`py3-none` and `cp39-abi3` wheels match `cp311`),
+        wheels built for `any` platform match any platform tag.
+        """
+        packagetype = artifact['packagetype']
+        if self.packagetypes and packagetype not in self.packagetypes:
+            return False
+        if packagetype == 'sdist' or not (self.python_tag or self.platform_tag):
+            return True
+        if packagetype != 'bdist_wheel':
+            return False
+
+        python_tags, abi_tags, platform_tags = get_wheel_tags(artifact['filename'])
+        if self.compatible_tags:
+            if not any((python_tag, abi_tag) in self.compatible_tags
+                       for python_tag in python_tags for abi_tag in abi_tags):
+                return False
+        elif self.python_tag and self.python_tag not in python_tags:
+            return False
+        if self.platform_tag and not ({self.platform_tag, 'any'} & platform_tags):
+            return False
+        return True
+
+
+def serialize_output(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    return value
 
 
 def set_output(name, value):
     with open(os.environ['GITHUB_OUTPUT'], 'a') as fh:
-        print(f'{name}={value}', file=fh)
+        print(f'{name}={serialize_output(value)}', file=fh)
 
 
 def get_exponential_backoff_in_seconds(attempt_number: int) -> int:
@@ -51,17 +123,62 @@ def get_exponential_backoff_in_seconds(attempt_number: int) -> int:
     return pow(attempt_number + 2, 2)
 
 
-def fetch_package_data(name, package_index_url):
-    metadata = None
-    with closing(urlopen(package_index_url.format(name))) as f:
-        print(
-            f"::debug::Fetching metadata for {name} from {package_index_url.format(name)}")
-        reader = codecs.getreader("utf-8")
-        metadata = json.load(reader(f))
-        print(f"::debug::Done fetching metadata")
+def fetch_package_data(name, package_index_url, cache: Optional[MetadataCache] = None,
+                       trace: Optional[RequestTrace] = None, attempt=0, url_template=None):
+    url = package_index_url.format(name)
+    # the package name is left out, so requests of all packages are grouped in the trace
+    url_template = url_template or urlparse(package_index_url.format("{name}")).path
+    conditional_headers = cache.get_conditional_headers(url) if cache else {}
+    print(f"::debug::Fetching metadata for {name} from {url}")
+    started_at = time.perf_counter()
+    try:
+        with closing(urlopen(Request(url, headers=conditional_headers))) as f:
+            body = f.read()
+            if trace:
+                trace.record("GET", url, f.status, started_at, len(body), attempt, f.headers, url_template)
+            if cache:
+                cache.store(url, body, f.headers)
+        if cache:
+            cache.record(miss=not conditional_headers,
+                         revalidation=bool(conditional_headers))
+    except HTTPError as e:
+        if trace:
+            trace.record("GET", url, e.code, started_at, 0, attempt, e.headers, url_template)
+        if e.code != 304 or not conditional_headers:
+            raise
+        body = cache.load(url)
+        if body is None:
+            print(f"::debug::Cached metadata for {name} was evicted, fetching it again")
+            return fetch_package_data(name, package_index_url, trace=trace, attempt=attempt, url_template=url_template)
+        print(f"::debug::Metadata for {name} is not modified, using cached response")
+        cache.record(hit=True, revalidation=True)
+    except URLError as e:
+        if trace:
+            trace.record("GET", url, None, started_at, retry=attempt, url_template=url_template,
+                         error=type(e.reason).__name__)
+        raise
+    metadata = json.loads(body)
+    print(f"::debug::Done fetching metadata")
     return metadata
 
 
+def fetch_release_data(name, version, index_url, cache: Optional[MetadataCache] = None,
+                       trace: Optional[RequestTrace] = None, attempt=0):
+    """
+    Fetches metadata of a single release from the per-version endpoint,
+    which is much smaller than the whole package document.
+    Returns None if the package index doesn't have this release.
+    """
+    try:
+        return fetch_package_data(name, f"{index_url}/{{}}/{version}/json", cache=cache, trace=trace, attempt=attempt,
+                                  url_template=f"{urlparse(index_url).path}/{{name}}/{{version}}/json")
+    except HTTPError as e:
+        if e.code != 404:
+            raise
+        print(f"::debug::Release {version} of {name} is not found in {index_url}")
+        return None
+
+
 def get_package_info(package_metadata):
     info = {}
     info['name'] = package_metadata['info']['name']
@@ -73,14 +190,46 @@ def get_package_info(package_metadata):
     return info
 
 
-def get_artifact_version(metadata, version):
+def normalize_version(version: str) -> str:
+    # packaging is only needed when looking up a version, it isn't imported otherwise
+    from packaging.version import InvalidVersion, Version
+
+    try:
+        return str(Version(version))
+    except InvalidVersion:
+        return version
+
+
+def get_release_index(metadata) -> dict:
+    """
+    Maps normalized versions to their artifacts.
+    Every version is parsed, build the index once per metadata document
+    and pass it to the lookups, so they are O(1).
+    """
+    return {
+        normalize_version(pypi_version): artifacts
+        for pypi_version, artifacts in metadata.get('releases', {}).items()
+    }
+
+
+def get_release_artifacts(metadata, version=None, release_index: Optional[dict] = None) -> list:
+    """
+    Returns all artifacts of the release, or of the newest release if version is not provided.
+    The release index is built when it's not provided.
+    """
+    if not version:
+        return metadata['urls']
+    if release_index is None:
+        release_index = get_release_index(metadata)
+    return release_index.get(normalize_version(version), [])
+
+
+def get_artifact_version(metadata, version, release_index: Optional[dict] = None):
     artifact = None
-    for pypi_version in metadata['releases']:
-        if str(Version(pypi_version)) == version:
-            for version_artifact in metadata['releases'][pypi_version]:
-                if version_artifact['packagetype'] == 'sdist':
-                    artifact = version_artifact
-                    break
+    for version_artifact in get_release_artifacts(metadata, version, release_index):
+        if version_artifact['packagetype'] == 'sdist':
+            artifact = version_artifact
+            break
     return artifact
 
 
@@ -95,28 +244,141 @@ def get_latest_artifact_url(metadata):
     return artifact
 
 
-def get_artifact_checksum(artifact, package_info):
-    checksum = None
-    if 'digests' in artifact and 'sha256' in artifact['digests']:
-        print(f"::debug::Using provided checksum for {package_info['name']}")
-        checksum = artifact['digests']['sha256']
-    else:
+def get_wheel_tags(filename: str) -> Tuple[FrozenSet[str], FrozenSet[str], FrozenSet[str]]:
+    """
+    Returns python, ABI and platform tags of a wheel, following the wheel filename convention:
+    {distribution}-{version}(-{build tag})?-{python tag}-{abi tag}-{platform tag}.whl
+    Compressed tag sets like `py2.py3` are expanded.
+    """
+    parts = filename[:-len('.whl')].split('-')
+    return frozenset(parts[-3].split('.')), frozenset(parts[-2].split('.')), frozenset(parts[-1].split('.'))
+
+
+def get_compatible_tags(python_tag: str) -> FrozenSet[Tuple[str, str]]:
+    """
+    Returns the interpreter and ABI tags of the wheels which install on `python_tag`:
+    - `cpXY`: `cpXY-cpXY`, `cpXY-abi3` and older `cpXW-abi3`, `cpXY-none`, `pyXY-none`, `pyX-none`...
+    - `pyX` / `pyXY`: `pyX-none`, and `pyXY-none` with older `pyXW-none`
+    Returns nothing for other tags (ex: `pp310`), they only match wheels with that exact python tag.
+    """
+    # packaging is only needed when filtering wheels, it isn't imported otherwise
+    from packaging import tags
+
+    interpreter, digits = python_tag[:2], python_tag[2:]
+    if interpreter not in ('cp', 'py') or not digits.isdigit():
+        return frozenset()
+    python_version = (int(digits[0]), int(digits[1:])) if len(digits) > 1 else (int(digits),)
+    compatible = list(tags.compatible_tags(python_version, python_tag if interpreter == 'cp' else None, ['any']))
+    if interpreter == 'cp' and len(python_version) > 1:
+        compatible += tags.cpython_tags(python_version, [python_tag], ['any'])
+    return frozenset((tag.interpreter, tag.abi) for tag in compatible)
+
+
+def select_artifacts(release_artifacts, artifact_filter: ArtifactFilter) -> List[dict]:
+    return [
+        {
+            'filename': artifact['filename'],
+            'packagetype': artifact['packagetype'],
+            'python_version': artifact.get('python_version', ''),
+            'url': artifact['url'],
+            'digests': artifact.get('digests') or {},
+        }
+        for artifact in release_artifacts
+        if artifact_filter.matches(artifact)
+    ]
+
+
+def parse_artifact_filter(packagetypes: str, python_tag: str, platform_tag: str) -> ArtifactFilter:
+    return ArtifactFilter(
+        packagetypes=frozenset(packagetype.strip() for packagetype in packagetypes.split(",")
+                               if packagetype.strip()),
+        python_tag=python_tag.strip(),
+        platform_tag=platform_tag.strip(),
+    )
+
+
+def compute_stream_checksums(stream, checksum_types: Iterable[str], chunk_size=CHECKSUM_CHUNK_SIZE) -> Tuple[dict, int]:
+    """
+    Feeds the stream into all requested hashers in a single pass.
+    The stream is read chunk by chunk into one reusable buffer,
+    so memory usage doesn't depend on the artifact size.
+    Returns checksums keyed by checksum type and the number of bytes read.
+    """
+    hashers = {checksum_type: SUPPORTED_CHECKSUM_TYPES[checksum_type]()
+               for checksum_type in checksum_types}
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    size = 0
+    while True:
+        read = stream.readinto(buffer)
+        if not read:
+            break
+        for hasher in hashers.values():
+            hasher.update(view[:read])
+        size += read
+    return {checksum_type: hasher.hexdigest() for checksum_type, hasher in hashers.items()}, size
+
+
+def get_artifact_checksums(artifact, package_info, checksum_types=("sha256",),
+                           trace: Optional[RequestTrace] = None) -> dict:
+    digests = artifact.get('digests') or {}
+    checksums = {checksum_type: digests[checksum_type]
+                 for checksum_type in checksum_types if checksum_type in digests}
+    missing_checksum_types = [checksum_type for checksum_type in checksum_types
+                              if checksum_type not in checksums]
+    if checksums:
         print(
-            f"::debug::Fetching sdist to compute checksum for {package_info['name']}")
+            f"::debug::Using provided {', '.join(checksums)} checksum for {package_info['name']}")
+    if missing_checksum_types:
+        print(
+            f"::debug::Fetching sdist to compute {', '.join(missing_checksum_types)} checksum for {package_info['name']}")
+        started_at = time.monotonic()
+        trace_started_at = time.perf_counter()
         with closing(urlopen(artifact['url'])) as f:
-            checksum = sha256(f.read()).hexdigest()
-        print(f"::debug::Done fetching {package_info['name']}")
-    return checksum
+            computed_checksums, size = compute_stream_checksums(
+                f, missing_checksum_types)
+            if trace:
+                trace.record("GET", artifact['url'], f.status, trace_started_at, size, headers=f.headers,
+                             url_template=f"{{{artifact['packagetype']}_url}}")
+        elapsed = max(time.monotonic() - started_at, 1e-6)
+        print(f"::debug::Done fetching {package_info['name']} - "
+              f"{size} bytes in {elapsed:.2f}s ({size / elapsed:.0f} bytes/s)")
+        checksums.update(computed_checksums)
+    return {checksum_type: checksums[checksum_type] for checksum_type in checksum_types}
+
 
+def get_artifact_checksum(artifact, package_info):
+    return get_artifact_checksums(artifact, package_info)['sha256']
 
-def lookup_package(name, check_test_index, version=None, attempts_limit=3):
+
+def parse_checksum_types(checksum_types: str) -> List[str]:
+    """
+    Parses a comma separated list of extra checksum types.
+    `sha256` is always computed and comes first.
+    """
+    parsed_checksum_types = ["sha256"]
+    for checksum_type in checksum_types.split(","):
+        checksum_type = checksum_type.strip().lower()
+        if not checksum_type or checksum_type in parsed_checksum_types:
+            continue
+        if checksum_type not in SUPPORTED_CHECKSUM_TYPES:
+            raise ChecksumTypeNotSupportedError(
+                f"Checksum type {checksum_type} is not supported. "
+                f"Supported types: {', '.join(SUPPORTED_CHECKSUM_TYPES)}")
+        parsed_checksum_types.append(checksum_type)
+    return parsed_checksum_types
+
+
+def lookup_package(name, check_test_index, version=None, attempts_limit=3, checksum_types=("sha256",),
+                   cache: Optional[MetadataCache] = None, artifact_filter: Optional[ArtifactFilter] = None,
+                   trace: Optional[RequestTrace] = None):
     package_metadata = None
     package_info = {}
     artifact = None
+    release_artifacts = []
 
-    package_index_url = "https://pypi.io/pypi/{}/json"
-    if check_test_index:
-        package_index_url = "https://test.pypi.org/pypi/{}/json"
+    index_url = TEST_PYPI_URL if check_test_index else PYPI_URL
+    package_index_url = f"{index_url}/{{}}/json"
 
     print(f"::debug::Checking the following package index {package_index_url}")
 
@@ -124,7 +386,17 @@ def lookup_package(name, check_test_index, version=None, attempts_limit=3):
         print(
             f"::debug::Fetching package metadata - attempt {attempt + 1} / {attempts_limit}")
         try:
-            package_metadata = fetch_package_data(name, package_index_url)
+            if version:
+                # `urls` of a single release metadata lists artifacts of that release
+                package_metadata = fetch_release_data(
+                    name, version, index_url, cache=cache, trace=trace, attempt=attempt)
+                if package_metadata is not None:
+                    release_artifacts = get_release_artifacts(package_metadata)
+                    artifact = get_latest_artifact_url(package_metadata)
+
+            if artifact is None:
+                package_metadata = fetch_package_data(
+                    name, package_index_url, cache=cache, trace=trace, attempt=attempt)
 
             if package_metadata is None:
                 raise PackageMetadataNotFoundInPyPIError(
@@ -132,7 +404,11 @@ def lookup_package(name, check_test_index, version=None, attempts_limit=3):
             package_info = get_package_info(package_metadata)
 
             if version:
-                artifact = get_artifact_version(package_metadata, version)
+                if artifact is None:
+                    release_index = get_release_index(package_metadata)
+                    release_artifacts = get_release_artifacts(
+                        package_metadata, version, release_index)
+                    artifact = get_artifact_version(package_metadata, version, release_index)
                 if artifact is None:
                     raise PackageVersionNotFoundInPyPIError("Could not find an exact version match for "
                                                             f"{name} version {version}")
@@ -154,50 +430,166 @@ def lookup_package(name, check_test_index, version=None, attempts_limit=3):
     if artifact is None:
         print("::warning::Could not find an exact version match for "
               f"{name} version {version} after {attempts_limit} attempts. Using newest version instead.")
+        release_artifacts = get_release_artifacts(package_metadata)
         artifact = get_latest_artifact_url(package_metadata)
 
     if artifact:
         package_info['url'] = artifact['url']
-        package_info['checksum'] = get_artifact_checksum(
-            artifact, package_info)
+        package_info['checksums'] = get_artifact_checksums(
+            artifact, package_info, checksum_types, trace=trace)
+        package_info['checksum'] = package_info['checksums']['sha256']
     else:  # no sdist found
         package_info['url'] = ''
         package_info['checksum'] = ''
+        package_info['checksums'] = {}
         print("::warning::No sdist found for {name}")
     package_info['checksum_type'] = 'sha256'
+    package_info['artifacts'] = select_artifacts(
+        release_artifacts, artifact_filter or ArtifactFilter())
     return package_info
 
 
+def parse_package_specs(specs: str) -> List[Tuple[str, Optional[str]]]:
+    """
+    Parses a list of `name[==version]` specs separated by newlines or commas.
+    """
+    package_specs = []
+    seen_names = set()
+    for spec in specs.replace(",", "\n").splitlines():
+        spec = spec.strip()
+        if not spec:
+            continue
+        name, separator, version = spec.partition("==")
+        name = name.strip()
+        version = version.strip()
+        if not name or (separator and not version):
+            raise InvalidPackageSpecError(
+                f"Package spec {spec} should be in the form of name[==version]")
+        if name in seen_names:
+            raise InvalidPackageSpecError(
+                f"Package {name} is listed more than once")
+        seen_names.add(name)
+        package_specs.append((name, version or None))
+    return package_specs
+
+
+def lookup_packages(package_specs, check_test_index, attempts_limit=3, max_workers=4, checksum_types=("sha256",),
+                    cache: Optional[MetadataCache] = None, artifact_filter: Optional[ArtifactFilter] = None,
+                    trace: Optional[RequestTrace] = None) -> dict:
+    """
+    Looks up several packages concurrently over a bounded thread pool.
+    Every lookup keeps its own retry state, see `lookup_package`.
+    Returns package info keyed by package name, in the order of `package_specs`.
+    """
+    packages_info = {}
+    failures = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(lookup_package, name, check_test_index,
+                            version=version, attempts_limit=attempts_limit,
+                            checksum_types=checksum_types, cache=cache,
+                            artifact_filter=artifact_filter, trace=trace): name
+            for name, version in package_specs
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                packages_info[name] = future.result()
+            except Exception as e:
+                print(f"::error::Failed to fetch package info for {name}: {e}")
+                failures[name] = e
+
+    if failures:
+        raise RuntimeError(
+            f"Could not fetch package info for: {', '.join(sorted(failures))}")
+
+    return {name: packages_info[name] for name, _ in package_specs}
+
+
+def get_package_outputs(package_info: PackageInfo) -> dict:
+    return {
+        "name": package_info.name,
+        "version": package_info.version,
+        "homepage": package_info.homepage,
+        "summary": package_info.summary,
+        "author": package_info.author,
+        "author-email": package_info.author_email,
+        "source-url": package_info.url,
+        "source-checksum": package_info.checksum,
+        "source-checksum-type": package_info.checksum_type,
+        "source-checksums": package_info.checksums,
+        "artifacts": package_info.artifacts,
+    }
+
+
 def main():
-    package = os.environ["INPUT_PACKAGE"]
-    version = os.environ["INPUT_VERSION"]
+    package = os.environ.get("INPUT_PACKAGE", "")
+    version = os.environ.get("INPUT_VERSION", "")
+    packages = os.environ.get("INPUT_PACKAGES", "")
     check_test_index = os.environ["INPUT_CHECK-TEST-INDEX"] == "true"
     attempts_count = int(os.environ["INPUT_RETRIES"]) + 1
-
-    package_info = PackageInfo(
-        **lookup_package(package, check_test_index, version=version, attempts_limit=attempts_count))
-
-    print("::group::Python Package Info Outputs")
-    print(f"name={package_info.name}")
-    print(f"version={package_info.version}")
-    print(f"homepage={package_info.homepage}")
-    print(f"summary={package_info.summary}")
-    print(f"author={package_info.author}")
-    print(f"author-email={package_info.author_email}")
-    print(f"source-url={package_info.url}")
-    print(f"source-checksum={package_info.checksum}")
-    print(f"source-checksum-type={package_info.checksum_type}")
-    print("::endgroup::")
-
-    set_output("name", package_info.name)
-    set_output("version", package_info.version)
-    set_output("homepage", package_info.homepage)
-    set_output("summary", package_info.summary)
-    set_output("author", package_info.author)
-    set_output("author-email", package_info.author_email)
-    set_output("source-url", package_info.url)
-    set_output("source-checksum", package_info.checksum)
-    set_output("source-checksum-type", package_info.checksum_type)  # noqa
+    max_workers = int(os.environ.get("INPUT_MAX-WORKERS", "4"))
+    checksum_types = parse_checksum_types(
+        os.environ.get("INPUT_EXTRA-CHECKSUM-TYPES", ""))
+    artifact_filter = parse_artifact_filter(
+        os.environ.get("INPUT_ARTIFACT-TYPES", ""),
+        os.environ.get("INPUT_PYTHON-TAG", ""),
+        os.environ.get("INPUT_PLATFORM-TAG", ""),
+    )
+    cache_dir = os.environ.get("INPUT_CACHE-DIR", "")
+    cache = None
+    if cache_dir:
+        cache_max_size = int(os.environ.get("INPUT_CACHE-MAX-SIZE-MB", "256")) * 1024 * 1024
+        cache = MetadataCache(cache_dir, cache_max_size)
+
+    if not package and not packages:
+        raise RuntimeError("Either `package` or `packages` input should be provided")
+
+    # the step summary is written even when a lookup fails
+    with RequestTrace(os.environ.get("INPUT_TRACE-FILE", ""), "Python Package Info Requests") as trace:
+        if package:
+            package_info = PackageInfo(
+                **lookup_package(package, check_test_index, version=version, attempts_limit=attempts_count,
+                                 checksum_types=checksum_types, cache=cache, artifact_filter=artifact_filter,
+                                 trace=trace))
+            outputs = get_package_outputs(package_info)
+
+            print("::group::Python Package Info Outputs")
+            for name, value in outputs.items():
+                print(f"{name}={serialize_output(value)}")
+            print("::endgroup::")
+
+            for name, value in outputs.items():
+                set_output(name, value)
+
+        if packages:
+            package_specs = parse_package_specs(packages)
+            packages_info = lookup_packages(
+                package_specs, check_test_index, attempts_limit=attempts_count, max_workers=max_workers,
+                checksum_types=checksum_types, cache=cache, artifact_filter=artifact_filter, trace=trace)
+            packages_outputs = {
+                name: get_package_outputs(PackageInfo(**package_info))
+                for name, package_info in packages_info.items()
+            }
+
+            print("::group::Python Packages Info Outputs")
+            for name, outputs in packages_outputs.items():
+                print(f"{name}={serialize_output(outputs)}")
+            print("::endgroup::")
+
+            set_output("packages", packages_outputs)
+
+    if cache:
+        print("::group::Metadata Cache Outputs")
+        print(f"cache-hits={cache.hits}")
+        print(f"cache-misses={cache.misses}")
+        print(f"cache-revalidations={cache.revalidations}")
+        print("::endgroup::")
+
+        set_output("cache-hits", cache.hits)
+        set_output("cache-misses", cache.misses)
+        set_output("cache-revalidations", cache.revalidations)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+from hashlib import sha256
+from typing import Optional
+
+
+class MetadataCache:
+    """
+    On-disk cache of package index responses, safe to persist with actions/cache.
+    Every entry is addressed by the sha256 of its URL and stored as `<key>.json` (raw response)
+    next to `<key>.meta` (ETag and Last-Modified used for conditional requests).
+    Entries are evicted in least recently used order once the cache grows over `max_size_bytes`.
+    """
+
+    def __init__(self, cache_dir: str, max_size_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _get_entry_paths(self, url: str):
+        key = sha256(url.encode("utf-8")).hexdigest()
+        entry_path = os.path.join(self.cache_dir, key)
+        return f"{entry_path}.json", f"{entry_path}.meta"
+
+    def get_conditional_headers(self, url: str) -> dict:
+        """
+        Returns headers for a conditional request if the URL has a cached response.
+        """
+        body_path, meta_path = self._get_entry_paths(url)
+        if not os.path.exists(body_path):
+            return {}
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def load(self, url: str) -> Optional[bytes]:
+        body_path, meta_path = self._get_entry_paths(url)
+        try:
+            with open(body_path, "rb") as f:
+                body = f.read()
+            # mark the entry as recently used
+            os.utime(body_path)
+            os.utime(meta_path)
+        except OSError:
+            return None
+        return body
+
+    def store(self, url: str, body: bytes, headers) -> None:
+        meta = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+        }
+        if not meta["etag"] and not meta["last_modified"]:
+            # the response can't be revalidated, no reason to keep it
+            return
+
+        body_path, meta_path = self._get_entry_paths(url)
+        self._write_atomically(body_path, body)
+        self._write_atomically(meta_path, json.dumps(meta).encode("utf-8"))
+        self.evict()
+
+    def evict(self) -> None:
+        with self._lock:
+            entries = []
+            total_size = 0
+            for file_name in os.listdir(self.cache_dir):
+                if not file_name.endswith(".json"):
+                    continue
+                body_path = os.path.join(self.cache_dir, file_name)
+                meta_path = f"{body_path[:-len('.json')]}.meta"
+                try:
+                    stat = os.stat(body_path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, body_path, meta_path))
+                total_size += stat.st_size
+
+            for _, size, body_path, meta_path in sorted(entries):
+                if total_size <= self.max_size_bytes:
+                    break
+                print(f"::debug::Evicting {body_path} from metadata cache")
+                for path in (body_path, meta_path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                total_size -= size
+
+    def record(self, hit: bool = False, miss: bool = False, revalidation: bool = False) -> None:
+        with self._lock:
+            self.hits += hit
+            self.misses += miss
+            self.revalidations += revalidation
+
+    def _write_atomically(self, path: str, data: bytes) -> None:
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
@@ -1,114 +1,306 @@
-# graphql query to get list of issues for the github repo
-issues_query = """
-    query {
-        repository(owner:$org, name:$repo) {
-            issues(last:$num_items states:OPEN filterBy: {
-                labels: [$label]
-            }) {
-                edges {
-                    node {
-                        title
-                        assignees(first:10) {
-                            edges {
-                                node {
-                                    login
-                                }
-                            }
-                        }
-                        number
-                        id
-                        url
-                        labels(first:10) {
-                            edges {
-                                node {
-                                    name
-                                }
-                            }
+# imports
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from hashlib import sha256
+from typing import Dict, FrozenSet, Tuple
+
+# graphql variables declared in an operation header, with their type
+VARIABLE_DECLARATION_PATTERN = re.compile(r"\$(\w+)\s*:\s*([\w\[\]!]+)")
+# graphql variables used in an operation
+VARIABLE_USAGE_PATTERN = re.compile(r"\$(\w+)")
+
+
+@dataclass(frozen=True)
+class GraphQLQuery:
+    """
+    A static GraphQL document, sent with its values as variables.
+    Variables are checked once when the query is created: every declared variable
+    has to be used and every used variable has to be declared.
+    """
+
+    text: str
+    variable_types: Dict[str, str] = field(init=False)
+    required_variables: FrozenSet[str] = field(init=False)
+    sha256_hash: str = field(init=False)
+
+    def __post_init__(self):
+        # the operation header is everything before the selection set
+        header, _, body = self.text.partition("{")
+        variable_types = dict(VARIABLE_DECLARATION_PATTERN.findall(header))
+        used_variables = set(VARIABLE_USAGE_PATTERN.findall(body))
+        if used_variables != set(variable_types):
+            raise ValueError(
+                f"Variables of GraphQL query don't match, "
+                f"undeclared: {sorted(used_variables - set(variable_types))}, "
+                f"unused: {sorted(set(variable_types) - used_variables)}"
+            )
+        # frozen dataclass, fields are set once here
+        object.__setattr__(self, "variable_types", variable_types)
+        object.__setattr__(
+            self,
+            "required_variables",
+            frozenset(
+                name for name, variable_type in variable_types.items() if variable_type.endswith("!")
+            ),
+        )
+        object.__setattr__(self, "sha256_hash", sha256(self.text.encode("utf-8")).hexdigest())
+
+    def check_variables(self, variables: dict) -> None:
+        unknown_variables = set(variables) - set(self.variable_types)
+        missing_variables = {
+            name for name in self.required_variables if variables.get(name) is None
+        }
+        if unknown_variables or missing_variables:
+            raise ValueError(
+                f"Variables don't match GraphQL query, "
+                f"unknown: {sorted(unknown_variables)}, missing: {sorted(missing_variables)}"
+            )
+
+    def get_persisted_query_extensions(self) -> dict:
+        """
+        Automatic persisted queries extension, lets the query be sent by its hash alone.
+        """
+        return {"persistedQuery": {"version": 1, "sha256Hash": self.sha256_hash}}
+
+
+# graphql fields fetched for every issue and pr
+item_fields = """
+                title
+                assignees(first:10) {
+                    edges {
+                        node {
+                            login
                         }
-                        participants(first:20) {
-                            edges {
-                                node {
-                                    login
-                                }
-                            }
+                    }
+                }
+                number
+                id
+                url
+                labels(first:10) {
+                    edges {
+                        node {
+                            name
                         }
-                        createdAt
-                        updatedAt
-                        closedAt
-                        author {
+                    }
+                }
+                participants(first:20) {
+                    edges {
+                        node {
                             login
                         }
                     }
                 }
-            }
+                createdAt
+                updatedAt
+                closedAt
+                author {
+                    login
+                }
+                projectItems(first:10) {
+                    nodes {
+                        project {
+                            number
+                        }
+                    }
+                }
+"""
+
+# graphql fragments with issue and pr fields, shared by all sub-queries of a batch
+# unused fragments are invalid, so a batch only includes the fragments its sub-queries need
+issue_fragment = """
+    fragment issueFields on Issue {
+        %(item_fields)s
+    }
+""" % {"item_fields": item_fields.strip()}
+
+pr_fragment = """
+    fragment prFields on PullRequest {
+        %(item_fields)s
+    }
+""" % {"item_fields": item_fields.strip()}
+
+# graphql query to get a batch of aliased repository sub-queries along with the query cost
+items_batch_query = """
+    query($org: String! $num_items: Int! %(variables)s) {
+        %(repositories)s
+        rateLimit {
+            cost
+            remaining
         }
     }
+    %(fragments)s
+"""
+
+# graphql sub-query to get a repository under an alias, with its aliased issues/prs sub-queries
+repository_subquery = """
+        %(alias)s: repository(owner:$org, name:$%(alias)s_repo) {
+            %(connections)s
+        }
+"""
+
+# graphql sub-query to get a page of issues for the github repo, by label
+# (issues updated since the watermark, when $since is set)
+issues_subquery = """
+            %(alias)s: issues(first:$num_items after:$%(alias)s_after states:OPEN filterBy: {
+                labels: [$%(alias)s_label]
+                since: $since
+            }) {
+                pageInfo {
+                    hasNextPage
+                    endCursor
+                }
+                edges {
+                    node {
+                        ...issueFields
+                    }
+                }
+            }
 """
 
 # TODO: add back label filtering
-# graphql query to get list of prs for the github repo
-prs_query = """
-    query {
-        repository(owner:$org, name:$repo) {
-            pullRequests(last:$num_items states:OPEN) {
+# graphql sub-query to get a page of prs for the github repo, most recently updated first
+# (prs can't be filtered by update time, sweeps stop paging once prs are older than the watermark)
+prs_subquery = """
+            %(alias)s: pullRequests(first:$num_items after:$%(alias)s_after states:OPEN orderBy: {
+                field: UPDATED_AT
+                direction: DESC
+            }) {
+                pageInfo {
+                    hasNextPage
+                    endCursor
+                }
                 edges {
                     node {
-                        title
-                        assignees(first:10) {
-                            edges {
-                                node {
-                                    login
-                                }
-                            }
-                        }
-                        number
-                        id
-                        url
-                        labels(first:10) {
-                            edges {
-                                node {
-                                    name
-                                }
-                            }
-                        }
-                        participants(first:20) {
-                            edges {
-                                node {
-                                    login
-                                }
-                            }
-                        }
-                        createdAt
-                        updatedAt
-                        closedAt
-                        author {
-                            login
-                        }
+                        ...prFields
+                    }
+                }
+            }
+"""
+
+
+@lru_cache(maxsize=None)
+def get_items_batch_query(shape: Tuple[Tuple[str, ...], ...]) -> GraphQLQuery:
+    """
+    Get the GraphQL query for a batch of sub-queries, by its shape.
+    Batches with the same shape share the same document, only their variables differ.
+    ---
+    Inputs: shape (tuple with the kinds of connections, "issues" or "pullRequests", of each repo)
+    Outputs: query (GraphQLQuery), repos are aliased r0, r1... and their connections r0c0, r0c1...
+    """
+    variables = []
+    repositories = []
+    for repo_num, kinds in enumerate(shape):
+        repo_alias = f"r{repo_num}"
+        variables.append(f"${repo_alias}_repo: String!")
+        connections = []
+        for connection_num, kind in enumerate(kinds):
+            connection_alias = f"{repo_alias}c{connection_num}"
+            variables.append(f"${connection_alias}_after: String")
+            if kind == "issues":
+                variables.append(f"${connection_alias}_label: String!")
+                connections.append(issues_subquery % {"alias": connection_alias})
+            else:
+                connections.append(prs_subquery % {"alias": connection_alias})
+        repositories.append(
+            repository_subquery % {"alias": repo_alias, "connections": "".join(connections)}
+        )
+
+    kinds = {kind for repo_kinds in shape for kind in repo_kinds}
+    if "issues" in kinds:
+        variables.append("$since: DateTime")
+    fragments = [issue_fragment if kind == "issues" else pr_fragment for kind in sorted(kinds)]
+    return GraphQLQuery(
+        items_batch_query
+        % {
+            "variables": " ".join(variables),
+            "repositories": "".join(repositories),
+            "fragments": "".join(fragments),
+        }
+    )
+
+
+# graphql query to get a page of a team's repos and members, by its slug (and org)
+# a connection is left out with its $with_* variable once all its pages are fetched
+team_query = GraphQLQuery("""
+    query(
+        $org: String!
+        $team: String!
+        $num_items: Int!
+        $repos_after: String
+        $members_after: String
+        $with_repos: Boolean!
+        $with_members: Boolean!
+    ) {
+        organization(login: $org) {
+            team(slug: $team) {
+                repositories(first:$num_items after:$repos_after) @include(if: $with_repos) {
+                    pageInfo {
+                        hasNextPage
+                        endCursor
+                    }
+                    nodes {
+                        name
+                        isPrivate
+                    }
+                }
+                members(first:$num_items after:$members_after) @include(if: $with_members) {
+                    pageInfo {
+                        hasNextPage
+                        endCursor
+                    }
+                    nodes {
+                        login
                     }
                 }
             }
         }
     }
-"""
+""")
 
 # graphql query to get project id by its number (and org)
-project_id_query = """
-    query {
+project_id_query = GraphQLQuery("""
+    query($org: String! $project_num: Int!) {
         organization(login: $org) {
             projectV2(number: $project_num) {
               id
             }
         }
     }
+""")
+
+# graphql mutation to add a batch of aliased items to project (v2)
+add_items_batch_mutation = """
+    mutation($project_id: ID! %(variables)s) {
+        %(mutations)s
+    }
 """
 
-# graphql mutation to add item to project (v2) by project_id and content_id
-add_item_to_project_mutation = """
-    mutation {
-        addProjectV2ItemById(input: {projectId: $project_id contentId: $item_id}) {
+# graphql sub-mutation to add item to project (v2) under an alias, by project_id and content_id
+add_item_to_project_submutation = """
+        %(alias)s: addProjectV2ItemById(input: {projectId: $project_id contentId: $%(alias)s_item_id}) {
             item {
                 id
             }
         }
-    }
 """
+
+
+@lru_cache(maxsize=None)
+def get_add_items_mutation(items_count: int) -> GraphQLQuery:
+    """
+    Get the GraphQL mutation adding a batch of items to a project, by the number of items.
+    ---
+    Inputs: items_count (int)
+    Outputs: mutation (GraphQLQuery), items are aliased m0, m1...
+    """
+    aliases = [f"m{item_num}" for item_num in range(items_count)]
+    return GraphQLQuery(
+        add_items_batch_mutation
+        % {
+            "variables": " ".join(f"${alias}_item_id: ID!" for alias in aliases),
+            "mutations": "".join(
+                add_item_to_project_submutation % {"alias": alias} for alias in aliases
+            ),
+        }
+    )
@@ -0,0 +1,72 @@
+# imports
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# httpx is optional, only needed for HTTP/2 (pip install "httpx[http2]")
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Number of connections kept alive per host, covers the parallel repo sweeps and mutation requests
+POOL_SIZE = 8
+# Seconds to wait for GitHub to connect or answer
+TIMEOUT_SECONDS = 30
+# Retries of connection errors and transient gateway errors
+# (GraphQL POSTs here are queries or idempotent addProjectV2ItemById mutations, so they can be retried)
+RETRY = Retry(
+    total=3,
+    backoff_factor=1,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=frozenset({"GET", "POST"}),
+    raise_on_status=False,
+)
+
+# errors raised by either client when a request can't be completed
+REQUEST_ERRORS = (requests.exceptions.RequestException,) + ((httpx.HTTPError,) if httpx else ())
+
+
+def get_session(headers: dict, http2: bool = False):
+    """
+    Get an HTTP session keeping connections to GitHub alive across requests.
+    With http2, an httpx client multiplexing requests over a single HTTP/2 connection is used
+    if httpx (with the http2 extra) is installed, a pooled requests session otherwise.
+    ---
+    Inputs: headers (dict), http2 (bool)
+    Outputs: session (requests.Session or httpx.Client)
+    """
+    if http2:
+        if httpx is None:
+            print("httpx is not installed, falling back to HTTP/1.1...\n")
+        else:
+            try:
+                # httpx only retries connection errors
+                transport = httpx.HTTPTransport(
+                    http2=True,
+                    retries=RETRY.total,
+                    limits=httpx.Limits(max_keepalive_connections=POOL_SIZE),
+                )
+                return httpx.Client(headers=headers, timeout=TIMEOUT_SECONDS, transport=transport)
+            except ImportError:
+                # the h2 package comes with httpx[http2]
+                print("httpx is installed without HTTP/2 support, falling back to HTTP/1.1...\n")
+
+    session = requests.Session()
+    session.headers.update(headers)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=RETRY)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_retries_count(response) -> int:
+    """
+    Get the number of times a request was retried by the session before this response.
+    Only requests sessions keep track of it, 0 for httpx clients.
+    ---
+    Inputs: response (requests.Response or httpx.Response)
+    Outputs: retries_count (int)
+    """
+    retries = getattr(getattr(response, "raw", None), "retries", None)
+    return len(retries.history) if retries is not None else 0
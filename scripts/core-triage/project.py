@@ -1,10 +1,18 @@
 # imports
 import os
-import requests
-from typing import List
+import json
+import argparse
+import asyncio
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlparse
 
 # TODO: improve
 from graphql_queries import *
+from http_session import REQUEST_ERRORS, TIMEOUT_SECONDS, get_retries_count, get_session
+from request_trace import RequestTrace
 
 # TODO: what is error handling?
 
@@ -38,185 +46,689 @@ ISSUE_LABELS = [
 PR_LABELS = ["ready_for_review"]
 # GitHub TOKEN environment variable name TODO: make this input? hardcoded to match GH action
 TOKEN_VAR = "GH_TOKEN"
-# Number of items per query -- max is 100 TODO: paging?
+# Number of items per page -- max is 100
 NUM_ITEMS = 100
+# Number of issues/prs sub-queries aliased into a single GraphQL query
+# keeps every query well under GitHub's node limit (500,000) and query cost limits
+BATCH_SIZE = 50
+# Number of repos swept at the same time
+MAX_PARALLEL_REPOS = 4
+# Number of addProjectV2ItemById mutations aliased into a single GraphQL request
+MUTATION_BATCH_SIZE = 20
+# Number of mutation requests in flight -- GitHub asks to avoid concurrent requests,
+# keep this low to stay clear of secondary rate limits
+MAX_PARALLEL_MUTATIONS = 2
+# GraphQL secondary rate limit is 2,000 points per minute and each mutation costs 5 points
+MUTATIONS_PER_MINUTE = 300
+# Send GraphQL queries by their sha256 hash first (automatic persisted queries), the full
+# document is only sent when the server doesn't know the hash yet.
+# GitHub doesn't support persisted queries (yet), keep off unless going through a proxy which does
+PERSISTED_QUERIES = False
+# answers of servers which don't know the hash yet, or don't support persisted queries at all
+PERSISTED_QUERY_ERRORS = frozenset({"PersistedQueryNotFound", "PersistedQueryNotSupported"})
+# File keeping the watermark of the last successful sweep, only items updated since are processed
+STATE_FILE = ".core-triage-state.json"
+# Overlap between consecutive sweeps, covers clock differences with GitHub
+WATERMARK_OVERLAP = timedelta(minutes=5)
+# File caching the core team's repos and members, which rarely change
+TEAM_CACHE_FILE = ".core-triage-team.json"
+TEAM_CACHE_TTL = timedelta(hours=6)
 
 # API stuff -- not uppercase because...
 headers = {"Authorization": f"token {os.environ.get(TOKEN_VAR)}"}
-gh_api_url = "https://api.github.com"
-gh_graphql_url = f"{gh_api_url}/graphql"
+# set by GitHub Actions runners, can point to a local stand-in
+gh_api_url = os.environ.get("GITHUB_API_URL", "https://api.github.com")
+gh_graphql_url = os.environ.get("GITHUB_GRAPHQL_URL", f"{gh_api_url}/graphql")
+# connections are kept alive and shared by all requests
+session = get_session(headers)
+# every request is recorded, the summary is added to the job summary when running in GitHub Actions
+trace = RequestTrace(title="Core Triage Requests")
+# 0: only failed responses are printed, 1: status of every response, 2: body of every response
+verbosity = 0
 
 # functions
-def process_request(url: str, headers: dict, json: dict = None) -> dict:
+def process_request(url: str, headers: dict, json: dict = None, url_template: str = None) -> dict:
     """
-    Process a request to the GitHub API (GET or POST, based on json).
+    Process a request to the GitHub API (GET or POST, based on json) over the shared session.
+    Responses are printed depending on verbosity, failed responses are always printed and raised.
+    Every request is recorded in the trace, grouped by url_template.
     ---
-    Inputs: url, headers, json (optional)
+    Inputs: url, headers, json (optional), url_template (optional)
     Outputs: response (dict)
     """
-    if json:
-        r = requests.post(url, headers=headers, json=json)
-    else:
-        r = requests.get(url, headers=headers)
+    method = "POST" if json else "GET"
+    started_at = time.perf_counter()
+    try:
+        if json:
+            r = session.post(url, headers=headers, json=json, timeout=TIMEOUT_SECONDS)
+        else:
+            r = session.get(url, headers=headers, timeout=TIMEOUT_SECONDS)
+    except REQUEST_ERRORS as e:
+        trace.record(method, url, None, started_at, url_template=url_template, error=type(e).__name__)
+        raise
+    trace.record(method, url, r.status_code, started_at, len(r.content), get_retries_count(r), r.headers, url_template)
 
-    print(r.status_code)
-    print(r.text)
+    failed = r.status_code >= 400
+    if failed or verbosity >= 1:
+        print(f"{r.status_code} {url} ({r.elapsed.total_seconds():.2f}s)")
+    if failed or verbosity >= 2:
+        print(r.text)
+    # a rate limited or failed request doesn't return data, callers shouldn't take it for an empty result
+    r.raise_for_status()
 
     return r.json()
 
 
-def get_core_repos(team: str) -> list:
+def run_query(query: GraphQLQuery, variables: dict, operation: str) -> dict:
     """
-    Get a list of Core repos.
+    Run a GraphQL query (or mutation) with variables.
+    The operation name tells queries apart in the trace, as they are all sent to the same URL.
     ---
-    Inputs: team (str)
-    Outputs: core_repos (list of str)
+    Inputs: query (GraphQLQuery), variables (dict), operation (str)
+    Outputs: response (dict)
     """
-    # add the repos names owned by the team
-    team_repos_url = f"{gh_api_url}/orgs/{ORG}/teams/{team}/repos"
-    r = process_request(team_repos_url, headers=headers)
-    core_repos = [repo["name"] for repo in r if not repo["private"]]
-    core_repos.extend(EXTRA_REPOS)
+    query.check_variables(variables)
+    url_template = f"{urlparse(gh_graphql_url).path} {operation}"
+    if PERSISTED_QUERIES:
+        extensions = query.get_persisted_query_extensions()
+        response = process_request(
+            gh_graphql_url,
+            headers=headers,
+            json={"variables": variables, "extensions": extensions},
+            url_template=url_template,
+        )
+        errors = response.get("errors") or []
+        if "data" in response and not any(error.get("message") in PERSISTED_QUERY_ERRORS for error in errors):
+            return response
+        # register the query along with its hash, or send it in full when the hash alone returned no data
+        return process_request(
+            gh_graphql_url,
+            headers=headers,
+            json={"query": query.text, "variables": variables, "extensions": extensions},
+            url_template=url_template,
+        )
+    return process_request(
+        gh_graphql_url,
+        headers=headers,
+        json={"query": query.text, "variables": variables},
+        url_template=url_template,
+    )
 
-    return sorted(list(set(core_repos)))
 
+def get_project_id(project_num: int) -> str:
+    """
+    Get a project's ID from its number.
+    ---
+    Inputs: project_num (int)
+    Outputs: project_id (str)
+    """
+    project_id = run_query(
+        project_id_query, {"org": ORG, "project_num": project_num}, "projectId"
+    )["data"]["organization"]["projectV2"]["id"]
+    return project_id
 
-def get_core_members(team: str) -> list:
+
+def is_in_project(item: dict, project_num: int) -> bool:
     """
-    Get a list of Core members' GitHub logins (usernames).
+    Check if an issue/pr is already in a project, from the projects fetched along with it.
+    Only its first projects are fetched, an item in many projects may be added again (which is a no-op).
     ---
-    Inputs: team (str)
-    Outputs: core_members (list of str)
+    Inputs: item (dict, item edge), project_num (int)
+    Outputs: in_project (bool)
     """
-    # add the GH logins of team members
-    team_members_url = f"{gh_api_url}/orgs/{ORG}/teams/{team}/members"
-    r = process_request(team_members_url, headers=headers)
-    core_members = [login["login"] for login in r]
+    project_items = (item["node"].get("projectItems") or {}).get("nodes") or []
+    return any(
+        project_item and (project_item.get("project") or {}).get("number") == project_num
+        for project_item in project_items
+    )
+
 
-    return sorted(core_members)
+def fetch_team(team: str, num_items: int) -> Tuple[List[str], List[str]]:
+    """
+    Fetch a team's public repos and members, paging through both in the same GraphQL queries.
+    ---
+    Inputs: team (str), num_items (int)
+    Outputs: team_repos (list of str), team_members (list of str)
+    """
+    team_repos = []
+    team_members = []
+    variables = {
+        "org": ORG,
+        "team": team,
+        "num_items": num_items,
+        "repos_after": None,
+        "members_after": None,
+        "with_repos": True,
+        "with_members": True,
+    }
+    while variables["with_repos"] or variables["with_members"]:
+        team_page = run_query(team_query, variables, "team")["data"]["organization"]["team"]
+        if team_page is None:
+            raise RuntimeError(f"Could not find team: {team}")
+        if variables["with_repos"]:
+            repos = team_page["repositories"]
+            team_repos.extend(repo["name"] for repo in repos["nodes"] if not repo["isPrivate"])
+            variables["with_repos"] = repos["pageInfo"]["hasNextPage"]
+            variables["repos_after"] = repos["pageInfo"]["endCursor"]
+        if variables["with_members"]:
+            members = team_page["members"]
+            team_members.extend(member["login"] for member in members["nodes"])
+            variables["with_members"] = members["pageInfo"]["hasNextPage"]
+            variables["members_after"] = members["pageInfo"]["endCursor"]
+    return team_repos, team_members
 
 
-def get_project_id(project_num: int) -> str:
+def get_core_team(
+    team: str, cache_file: str = TEAM_CACHE_FILE, cache_ttl: timedelta = TEAM_CACHE_TTL
+) -> Tuple[List[str], List[str]]:
     """
-    Get a project's ID from its number.
+    Get a list of Core repos and a list of Core members' GitHub logins (usernames).
+    The team is cached in cache_file, and fetched again once older than cache_ttl.
     ---
-    Inputs: project_num (int)
-    Outputs: project_id (str)
+    Inputs: team (str), cache_file (str), cache_ttl (timedelta)
+    Outputs: core_repos (list of str), core_members (list of str)
     """
-    project_id = process_request(
-        gh_graphql_url,
-        headers=headers,
-        json={
-            "query": project_id_query.replace("$org", f'"{ORG}"').replace(
-                "$project_num", f"{project_num}"
-            )
-        },
-    )["data"]["organization"]["projectV2"]["id"]
-    return project_id
+    cached_team = load_state(cache_file)
+    cached_team_age = time.time() - cached_team.get("fetched_at", 0)
+    is_cached = (cached_team.get("org"), cached_team.get("team")) == (ORG, team)
+    if is_cached and cached_team_age < cache_ttl.total_seconds():
+        print(f"Using team repos and members cached {cached_team_age / 60:.0f} minutes ago...\n")
+        team_repos, team_members = cached_team["repos"], cached_team["members"]
+    else:
+        team_repos, team_members = fetch_team(team, NUM_ITEMS)
+        save_state(
+            cache_file,
+            {"org": ORG, "team": team, "fetched_at": time.time(), "repos": team_repos, "members": team_members},
+        )
 
+    # include some extra repos not in the team
+    core_repos = sorted(set(team_repos + EXTRA_REPOS))
+    return core_repos, sorted(team_members)
 
-def get_issues(repo: str, label: str, num_items: int) -> List[dict]:
+
+def get_items_subqueries(repos: List[str], issue_labels: List[str]) -> List[Tuple[str, str, Optional[str]]]:
     """
-    Get a list of issues for the given repo and label.
+    Get the list of issues/prs sub-queries needed to sweep the repos.
     ---
-    Inputs: repo (str), label (str), num_items (int)
-    Outputs: issues (list of dict)
+    Inputs: repos (list of str), issue_labels (list of str)
+    Outputs: subqueries (list of (repo, "issues" or "pullRequests", label or None))
     """
-    # replace variables in query string and filter down to the issues' edges
-    issues = process_request(
-        gh_graphql_url,
-        headers=headers,
-        json={
-            "query": issues_query.replace("$org", f'"{ORG}"')
-            .replace("$repo", f'"{repo}"')
-            .replace("$num_items", f"{num_items}")
-            .replace("$label", f'"{label}"')
-        },
-    )["data"]["repository"]["issues"]["edges"]
-    return issues
+    subqueries = []
+    for repo in repos:
+        for issue_label in issue_labels:
+            subqueries.append((repo, "issues", issue_label))
+        # TODO: add back label filtering
+        subqueries.append((repo, "pullRequests", None))
+    return subqueries
 
 
-def get_prs(repo: str, num_items: int) -> List[dict]:
+def build_items_batch_query(
+    pages: List[Tuple[Tuple[str, str, Optional[str]], Optional[str]]],
+    num_items: int,
+    since: Optional[str] = None,
+) -> Tuple[GraphQLQuery, dict, Dict[Tuple[str, str], Tuple[str, str, Optional[str]]]]:
     """
-    Get a list of prs for the given repo and label.
+    Build a single GraphQL query aliasing a page of each of the given sub-queries, grouped by repo.
+    Issues are only requested if updated since the given timestamp.
     ---
-    Inputs: repo (str), num_items (int)
-    Outputs: prs (list of dict)
+    Inputs: pages (list of ((repo, kind, label), cursor or None)), num_items (int), since (str, optional)
+    Outputs: query (GraphQLQuery), variables (dict), aliases (dict of (repo alias, connection alias) to sub-query)
     """
-    # replace variables in query string and filter down to the issues' edges
-    prs = process_request(
-        gh_graphql_url,
-        headers=headers,
-        json={
-            "query": prs_query.replace("$org", f'"{ORG}"')
-            .replace("$repo", f'"{repo}"')
-            .replace("$num_items", f"{num_items}")
-        },
-    )["data"]["repository"]["pullRequests"]["edges"]
-    return prs
+    connections_by_repo = {}
+    for subquery, cursor in pages:
+        connections_by_repo.setdefault(subquery[0], []).append((subquery, cursor))
+
+    shape = []
+    variables = {"org": ORG, "num_items": num_items}
+    aliases = {}
+    for repo_num, (repo, repo_pages) in enumerate(connections_by_repo.items()):
+        repo_alias = f"r{repo_num}"
+        variables[f"{repo_alias}_repo"] = repo
+        for connection_num, (subquery, cursor) in enumerate(repo_pages):
+            _, kind, label = subquery
+            connection_alias = f"{repo_alias}c{connection_num}"
+            aliases[(repo_alias, connection_alias)] = subquery
+            variables[f"{connection_alias}_after"] = cursor
+            if kind == "issues":
+                variables[f"{connection_alias}_label"] = label
+                variables["since"] = since
+        shape.append(tuple(subquery[1] for subquery, _ in repo_pages))
+
+    return get_items_batch_query(tuple(shape)), variables, aliases
+
+
+def get_items_batched(
+    subqueries: List[Tuple[str, str, Optional[str]]],
+    num_items: int,
+    batch_size: int,
+    since: Optional[str] = None,
+) -> Iterator[Tuple[str, str, Optional[str], List[dict]]]:
+    """
+    Get issues/prs for all sub-queries page by page, sending up to batch_size sub-queries per GraphQL request.
+    Sub-queries with more pages are queued again with their cursor, so only one page per sub-query is held.
+    When since is given, only issues/prs updated since then are returned.
+    ---
+    Inputs: subqueries (list of (repo, kind, label)), num_items (int), batch_size (int), since (str, optional)
+    Outputs: items (iterator of (repo, kind, label, list of item edges))
+    """
+    pending_pages = deque((subquery, None) for subquery in subqueries)
+    batch_num = 0
+    while pending_pages:
+        batch_num += 1
+        pages = [pending_pages.popleft() for _ in range(min(batch_size, len(pending_pages)))]
+        query, variables, aliases = build_items_batch_query(pages, num_items, since)
+        response = run_query(query, variables, "itemsBatch")
+
+        # items of a sub-query which errored would be skipped by this sweep, and by the next ones once the
+        # watermark moves, so the sweep fails instead
+        errors = response.get("errors") or []
+        data = response.get("data")
+        if errors or not data:
+            messages = "; ".join(error.get("message", "") for error in errors) or "no data returned"
+            raise RuntimeError(f"Could not get batch {batch_num} of items: {messages}")
+        rate_limit = data.get("rateLimit") or {}
+        print(
+            f"Batch {batch_num}: {len(aliases)} sub-queries, {len(pending_pages)} pending, "
+            f"cost {rate_limit.get('cost')}, remaining {rate_limit.get('remaining')}...\n"
+        )
+
+        for (repo_alias, connection_alias), subquery in aliases.items():
+            repo, kind, label = subquery
+            repository = data.get(repo_alias)
+            connection = repository.get(connection_alias) if repository else None
+            if connection is None:
+                raise RuntimeError(f"Could not get {kind} for repository: {repo}")
+            edges = connection["edges"]
+            if since and kind == "pullRequests":
+                # prs come most recently updated first, the rest of the pages are older
+                edges = [edge for edge in edges if edge["node"]["updatedAt"] >= since]
+                has_next_page = connection["pageInfo"]["hasNextPage"] and len(edges) == len(connection["edges"])
+            else:
+                has_next_page = connection["pageInfo"]["hasNextPage"]
+            if has_next_page:
+                pending_pages.append((subquery, connection["pageInfo"]["endCursor"]))
+            yield repo, kind, label, edges
+
+
+def load_state(state_file: str) -> dict:
+    """
+    Load a state file (last successful sweep, cached team), if any.
+    ---
+    Inputs: state_file (str)
+    Outputs: state (dict)
+    """
+    try:
+        with open(state_file) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state_file: str, state: dict) -> None:
+    """
+    Save a state file (successful sweep, cached team).
+    ---
+    Inputs: state_file (str), state (dict)
+    Outputs: None
+    """
+    tmp_state_file = f"{state_file}.tmp"
+    with open(tmp_state_file, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_state_file, state_file)
 
 
-def add_items_to_project(project_id: str, items: List[dict]) -> None:
+def get_sweep_since(state: dict, sweep: dict, full_resync: bool) -> Optional[str]:
     """
-    Adds GitHub items (issues or PRs) to a project by project_id and a list of item edges.
+    Get the watermark to sweep from, or None when every open item has to be processed.
+    A sweep over other repos or labels than the last one is a full resync.
+    ---
+    Inputs: state (dict), sweep (dict of project_num, repos and issue_labels), full_resync (bool)
+    Outputs: since (str or None)
+    """
+    if full_resync or "since" not in state:
+        return None
+    if any(state.get(key) != value for key, value in sweep.items()):
+        print("Repos or labels changed since the last sweep...\n")
+        return None
+    return state["since"]
+
+
+def build_add_items_mutation(
+    project_id: str, items: List[dict]
+) -> Tuple[GraphQLQuery, dict, Dict[str, dict]]:
+    """
+    Build a single GraphQL mutation adding all the given items to a project, one alias per item.
     ---
     Inputs: project_id (str), items (list of dict)
+    Outputs: mutation (GraphQLQuery), variables (dict), aliases (dict of alias to item)
+    """
+    variables = {"project_id": project_id}
+    aliases = {}
+    for item_num, item in enumerate(items):
+        alias = f"m{item_num}"
+        aliases[alias] = item
+        variables[f"{alias}_item_id"] = item["node"]["id"]
+
+    return get_add_items_mutation(len(items)), variables, aliases
+
+
+def add_items_batch(project_id: str, items: List[dict]) -> Dict[str, str]:
+    """
+    Adds a batch of GitHub items (issues or PRs) to a project in a single GraphQL request.
+    ---
+    Inputs: project_id (str), items (list of dict)
+    Outputs: failures (dict of item id to error message)
+    """
+    mutation, variables, aliases = build_add_items_mutation(project_id, items)
+    try:
+        response = run_query(mutation, variables, "addProjectV2ItemById")
+    except REQUEST_ERRORS + (ValueError,) as e:
+        return {item["node"]["id"]: f"{e}" for item in items}
+
+    failures = {}
+    # errors of aliased mutations point at the alias in their path
+    for error in response.get("errors", []):
+        path = error.get("path") or []
+        if path and path[0] in aliases:
+            failures[aliases[path[0]]["node"]["id"]] = error.get("message")
+        else:
+            print(f"GraphQL error: {error.get('message')}")
+
+    data = response.get("data") or {}
+    for alias, item in aliases.items():
+        if not data.get(alias) and item["node"]["id"] not in failures:
+            failures[item["node"]["id"]] = response.get("message", "item was not added")
+    return failures
+
+
+class MutationPacer:
+    """
+    Spaces out the mutation batches of all consumers, so mutations stay under mutations_per_minute.
+    """
+
+    def __init__(self, mutations_per_minute: float):
+        self.interval = 60 / mutations_per_minute
+        self.next_slot = 0.0
+
+    async def wait(self, mutations_count: int) -> None:
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self.next_slot)
+        # the slot is reserved right away, so consumers queue up in order
+        self.next_slot = slot + mutations_count * self.interval
+        await asyncio.sleep(slot - now)
+
+
+async def sweep_repo(
+    repo: str,
+    project_num: int,
+    issue_labels: List[str],
+    num_items: int,
+    since: Optional[str],
+    seen_item_ids: Set[str],
+    counts: Counter,
+    queue: asyncio.Queue,
+    repos_semaphore: asyncio.Semaphore,
+    sweep_failures: Dict[str, str],
+) -> None:
+    """
+    Producer task: queue the new issues/prs of a repo, skipping the items already seen or already in the project.
+    A repo which can't be read is recorded in sweep_failures, the other repos are still swept.
+    ---
+    Inputs: repo (str), project_num (int), issue_labels (list of str), num_items (int), since (str or None),
+        seen_item_ids (set of str), counts (Counter), queue (asyncio.Queue), repos_semaphore (asyncio.Semaphore),
+        sweep_failures (dict of repo to error message)
     Outputs: None
     """
-    for item in items:
-        print(item)
-        process_request(
-            gh_graphql_url,
-            headers=headers,
-            json={
-                "query": add_item_to_project_mutation.replace(
-                    "$project_id", f'"{project_id}"'
-                ).replace("$item_id", f'"{item["node"]["id"]}"')
-            },
+    async with repos_semaphore:
+        # all sub-queries of a repo fit in a single batch, pages are fetched in a thread
+        items_pages = get_items_batched(
+            get_items_subqueries([repo], issue_labels), num_items, BATCH_SIZE, since
         )
+        while True:
+            try:
+                items_page = await asyncio.to_thread(next, items_pages, None)
+            except REQUEST_ERRORS + (RuntimeError, ValueError) as e:
+                sweep_failures[repo] = f"{e}"
+                return
+            if items_page is None:
+                return
+            _, kind, label, items = items_page
+            print(f"Processing {kind} of repository: {repo} (label: {label})...\n")
+            for item in items:
+                # tasks only switch at awaits, checking and adding is safe
+                if item["node"]["id"] in seen_item_ids:
+                    counts["skipped"] += 1
+                    continue
+                seen_item_ids.add(item["node"]["id"])
+                if is_in_project(item, project_num):
+                    counts["skipped"] += 1
+                    continue
+                counts["new"] += 1
+                await queue.put(item)
 
 
-def main(
+async def add_queued_items(
+    project_id: str, queue: asyncio.Queue, pacer: MutationPacer, failures: Dict[str, str]
+) -> None:
+    """
+    Consumer task: add the queued items to a project in batches of aliased mutations, until it gets None.
+    ---
+    Inputs: project_id (str), queue (asyncio.Queue), pacer (MutationPacer), failures (dict of item id to error message)
+    Outputs: None
+    """
+    done = False
+    while not done:
+        batch = []
+        item = await queue.get()
+        # take whatever else is queued, up to a full batch
+        while item is not None:
+            batch.append(item)
+            if len(batch) == MUTATION_BATCH_SIZE or queue.empty():
+                break
+            item = queue.get_nowait()
+        done = item is None
+        if not batch:
+            continue
+        await pacer.wait(len(batch))
+        try:
+            failures.update(await asyncio.to_thread(add_items_batch, project_id, batch))
+        except Exception as e:
+            # a consumer stopping would leave producers waiting on a full queue
+            failures.update({item["node"]["id"]: f"{e}" for item in batch})
+
+
+async def async_main(
     project_num: int,
     core_team: str,
     issue_labels: List[str],
     pr_labels: List[str],
     num_items: int,
+    state_file: str = STATE_FILE,
+    full_resync: bool = False,
+    max_parallel_repos: int = MAX_PARALLEL_REPOS,
+    team_cache_file: str = TEAM_CACHE_FILE,
+    team_cache_ttl: timedelta = TEAM_CACHE_TTL,
+    mutations_per_minute: float = MUTATIONS_PER_MINUTE,
 ):
     """
-    Main script function.
-    All inputs have defaults.
+    Main script coroutine.
+    Each repo is swept by its own task (up to max_parallel_repos at a time), queueing new items
+    which are added to the project by a pool of MAX_PARALLEL_MUTATIONS consumer tasks.
     ---
-    Inputs: project_num (int), core_teams (str), issue_labels (list of str), pr_labels (list of str), num_items (int)
+    Inputs: project_num (int), core_teams (str), issue_labels (list of str), pr_labels (list of str), num_items (int),
+        state_file (str), full_resync (bool), max_parallel_repos (int), team_cache_file (str), team_cache_ttl (timedelta),
+        mutations_per_minute (float)
     Outputs: None
     """
+    # items updated while sweeping are picked up by the next sweep
+    sweep_started_at = datetime.now(timezone.utc) - WATERMARK_OVERLAP
 
-    project_id = get_project_id(project_num)
+    project_id, (core_repos, core_members) = await asyncio.gather(
+        asyncio.to_thread(get_project_id, project_num),
+        asyncio.to_thread(get_core_team, core_team, team_cache_file, team_cache_ttl),
+    )
     print(f"Project ID: {project_id}...\n")
-
-    core_members = get_core_members(core_team)
     print(f"Core members: {core_members}...\n")
-
-    core_repos = get_core_repos(core_team)
     print(f"Core repos: {core_repos}...\n")
 
-    for repo in core_repos:
-        print(f"Processing repository: {repo}...\n")
-        # for each issue label
-        for issue_label in issue_labels:
-            print(f"Processing issue label: {issue_label}...\n")
-            # get the list of issues for the repo and label
-            issues = get_issues(repo, issue_label, num_items)
-            # add issues to the project
-            add_items_to_project(project_id, issues)
+    sweep = {"project_num": project_num, "repos": core_repos, "issue_labels": sorted(issue_labels)}
+    since = get_sweep_since(load_state(state_file), sweep, full_resync)
+    print(f"Sweeping items updated since: {since or 'ever (full resync)'}...\n")
 
-        # TODO: add back label filtering
-        # get the list of PRs for the repo and label
-        prs = get_prs(repo, num_items)
-        # add PRs to the project
-        add_items_to_project(project_id, prs)
+    # issues with several labels are fetched once per label, only add each item once
+    seen_item_ids = set()
+    counts = Counter()
+    failures = {}
+    sweep_failures = {}
+
+    # bounded, so repos aren't swept further ahead than the mutations can keep up with
+    queue = asyncio.Queue(maxsize=MUTATION_BATCH_SIZE * MAX_PARALLEL_MUTATIONS)
+    pacer = MutationPacer(mutations_per_minute)
+    consumers = [
+        asyncio.create_task(add_queued_items(project_id, queue, pacer, failures))
+        for _ in range(MAX_PARALLEL_MUTATIONS)
+    ]
+    repos_semaphore = asyncio.Semaphore(max_parallel_repos)
+    try:
+        await asyncio.gather(
+            *(
+                sweep_repo(
+                    repo,
+                    project_num,
+                    issue_labels,
+                    num_items,
+                    since,
+                    seen_item_ids,
+                    counts,
+                    queue,
+                    repos_semaphore,
+                    sweep_failures,
+                )
+                for repo in core_repos
+            )
+        )
+        for _ in consumers:
+            await queue.put(None)
+        await asyncio.gather(*consumers)
+    finally:
+        for consumer in consumers:
+            consumer.cancel()
+
+    for repo, message in sweep_failures.items():
+        print(f"Could not sweep repository {repo}: {message}")
+    for item_id, message in failures.items():
+        print(f"Could not add item {item_id}: {message}")
+    print(
+        f"Added {counts['new'] - len(failures)} items, failed to add {len(failures)} items, "
+        f"skipped {counts['skipped']} duplicate or already added items...\n"
+    )
+
+    # keep the previous watermark when items failed, so they are retried on the next sweep
+    if sweep_failures:
+        # fails the run, so the failure is noticed
+        raise RuntimeError(f"Not moving the watermark, could not sweep {len(sweep_failures)} repositories")
+    if failures:
+        print(f"Not moving the watermark, {len(failures)} items failed...\n")
+        return
+    sweep["since"] = sweep_started_at.strftime("%Y-%m-%dT%H:%M:%SZ")
+    save_state(state_file, sweep)
+
+
+def main(
+    project_num: int,
+    core_team: str,
+    issue_labels: List[str],
+    pr_labels: List[str],
+    num_items: int,
+    state_file: str = STATE_FILE,
+    full_resync: bool = False,
+    max_parallel_repos: int = MAX_PARALLEL_REPOS,
+    team_cache_file: str = TEAM_CACHE_FILE,
+    team_cache_ttl: timedelta = TEAM_CACHE_TTL,
+    mutations_per_minute: float = MUTATIONS_PER_MINUTE,
+):
+    """
+    Main script function, runs async_main.
+    All inputs have defaults.
+    ---
+    Inputs: project_num (int), core_teams (str), issue_labels (list of str), pr_labels (list of str), num_items (int),
+        state_file (str), full_resync (bool), max_parallel_repos (int), team_cache_file (str), team_cache_ttl (timedelta),
+        mutations_per_minute (float)
+    Outputs: None
+    """
+    asyncio.run(
+        async_main(
+            project_num,
+            core_team,
+            issue_labels,
+            pr_labels,
+            num_items,
+            state_file=state_file,
+            full_resync=full_resync,
+            max_parallel_repos=max_parallel_repos,
+            team_cache_file=team_cache_file,
+            team_cache_ttl=team_cache_ttl,
+            mutations_per_minute=mutations_per_minute,
+        )
+    )
 
 
 # run script
 if __name__ == "__main__":
-    main(PROJECT_NUM, CORE_TEAM, ISSUE_LABELS, PR_LABELS, NUM_ITEMS)
+    parser = argparse.ArgumentParser(description="Add Core issues and PRs to the Core triage project.")
+    parser.add_argument(
+        "--full-resync",
+        action="store_true",
+        help="process every open item, instead of the items updated since the last successful sweep",
+    )
+    parser.add_argument("--state-file", default=STATE_FILE, help="file keeping the last sweep's watermark")
+    parser.add_argument(
+        "--max-parallel-repos",
+        type=int,
+        default=MAX_PARALLEL_REPOS,
+        help="number of repos swept at the same time",
+    )
+    parser.add_argument(
+        "--team-cache-ttl-minutes",
+        type=float,
+        default=TEAM_CACHE_TTL / timedelta(minutes=1),
+        help="minutes the team's repos and members are cached for, 0 to always fetch them",
+    )
+    parser.add_argument(
+        "--mutations-per-minute",
+        type=float,
+        default=MUTATIONS_PER_MINUTE,
+        help="pace of addProjectV2ItemById mutations, keeps them under GitHub's secondary rate limit",
+    )
+    parser.add_argument(
+        "--http2", action="store_true", help='send requests over HTTP/2, needs "httpx[http2]"'
+    )
+    parser.add_argument("--trace-file", default="", help="append a JSON line per request to this file")
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="count",
+        default=0,
+        help="print the status (-v) and the body (-vv) of every response",
+    )
+    args = parser.parse_args()
+
+    verbosity = args.verbose
+    if args.http2:
+        session = get_session(headers, http2=True)
+    trace = RequestTrace(args.trace_file, title="Core Triage Requests")
+
+    # the step summary is written even when the sweep fails
+    with trace:
+        main(
+            PROJECT_NUM,
+            CORE_TEAM,
+            ISSUE_LABELS,
+            PR_LABELS,
+            NUM_ITEMS,
+            state_file=args.state_file,
+            full_resync=args.full_resync,
+            max_parallel_repos=args.max_parallel_repos,
+            team_cache_ttl=timedelta(minutes=args.team_cache_ttl_minutes),
+            mutations_per_minute=args.mutations_per_minute,
+        )